@@ -0,0 +1,32 @@
+"""add created_at and keyset pagination indexes
+
+Revision ID: c3f1a9d2b7e4
+Revises: bce7f77f10a8
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f1a9d2b7e4'
+down_revision = 'bce7f77f10a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('item', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_index('ix_user_created_at_id', 'user', ['created_at', 'id'], unique=False)
+    op.create_index('ix_item_created_at_id', 'item', ['created_at', 'id'], unique=False)
+    op.create_index('ix_item_owner_id_created_at_id', 'item', ['owner_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_item_owner_id_created_at_id', table_name='item')
+    op.drop_index('ix_item_created_at_id', table_name='item')
+    op.drop_index('ix_user_created_at_id', table_name='user')
+    op.drop_column('item', 'created_at')
+    op.drop_column('user', 'created_at')
@@ -0,0 +1,30 @@
+"""add partial flag indexes and case-insensitive email index
+
+Revision ID: d4a7e2c91f05
+Revises: c3f1a9d2b7e4
+Create Date: 2026-10-17 11:03:27.540119
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7e2c91f05'
+down_revision = 'c3f1a9d2b7e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_user_is_superuser_partial', 'user', ['id'], unique=False, postgresql_where=sa.text('is_superuser'))
+    op.create_index('ix_user_is_active_partial', 'user', ['id'], unique=False, postgresql_where=sa.text('is_active'))
+    # Fails if two accounts differ only in the case of their email; merge or
+    # rename those before upgrading
+    op.create_index('uq_user_email_lower', 'user', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_user_email_lower', table_name='user')
+    op.drop_index('ix_user_is_active_partial', table_name='user')
+    op.drop_index('ix_user_is_superuser_partial', table_name='user')
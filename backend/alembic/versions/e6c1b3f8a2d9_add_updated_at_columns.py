@@ -0,0 +1,26 @@
+"""add updated_at columns for etags
+
+Revision ID: e6c1b3f8a2d9
+Revises: d4a7e2c91f05
+Create Date: 2026-10-17 14:26:08.902317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6c1b3f8a2d9'
+down_revision = 'd4a7e2c91f05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('item', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade():
+    op.drop_column('item', 'updated_at')
+    op.drop_column('user', 'updated_at')
@@ -0,0 +1,42 @@
+"""
+Conditional GET support.
+
+Routes compute a strong ETag from a cheap version of the resource and answer
+304 without a body when the client already holds it. A single row is
+versioned by its ``updated_at``. A page of a collection is versioned by the
+ids and ``updated_at`` of its rows and its total, which come with the page
+query anyway, so listings need no extra query for their ETag.
+"""
+
+import hashlib
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Return a strong ETag for the given version parts."""
+    digest = hashlib.blake2b(
+        "|".join(str(part) for part in parts).encode(), digest_size=16
+    )
+    return f'"{digest.hexdigest()}"'
+
+
+def page_etag(*parts: Any, rows: Sequence[Any]) -> str:
+    """Return the ETag of a page of ``rows``, identified by ``parts``."""
+    return make_etag(*parts, *((row.id, row.updated_at) for row in rows))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether ``If-None-Match`` lists ``etag`` (compared weakly, per RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -1,15 +1,17 @@
-from typing import Annotated
+from typing import Annotated, NamedTuple
 
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
 from pydantic import ValidationError
-from sqlmodel import Session
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
 from app.core.config import settings
-from app.core.security import ALGORITHM
-from app.db.session import get_session
+from app.core.pagination import Cursor, decode_cursor
+from app.core.security import decode_access_token
+from app.db.session import async_session_factory, get_async_session
 from app.models import TokenPayload, User
 
 oauth2_scheme = OAuth2PasswordBearer(
@@ -17,22 +19,61 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 # Use the session factory function directly
-get_db = get_session
+get_db = get_async_session
 
 # Type aliases for better readability
-SessionDep = Annotated[Session, Depends(get_db)]
+SessionDep = Annotated[AsyncSession, Depends(get_db)]
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Session factory for work that outlives the request's own session."""
+    return async_session_factory
+
+
+SessionFactoryDep = Annotated[
+    async_sessionmaker[AsyncSession], Depends(get_session_factory)
+]
+
+
+class PageCursors(NamedTuple):
+    after: Cursor | None
+    before: Cursor | None
+
+
+def get_page_cursors(
+    after: str | None = None, before: str | None = None
+) -> PageCursors:
+    """Decode the opaque ``after``/``before`` keyset pagination cursors."""
+    if after is not None and before is not None:
+        raise HTTPException(
+            status_code=400, detail="Use either after or before, not both"
+        )
+    try:
+        return PageCursors(
+            after=decode_cursor(after) if after else None,
+            before=decode_cursor(before) if before else None,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+CursorDep = Annotated[PageCursors, Depends(get_page_cursors)]
 
 
 async def get_current_user(db: SessionDep, token: str = Depends(oauth2_scheme)) -> User:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
+        token_data = TokenPayload(**decode_access_token(token))
+    except (jwt.InvalidTokenError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    if token_data.sub is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = crud.get_user_by_email(db, token_data.sub)
+    user = await crud.get_principal_async(db, token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
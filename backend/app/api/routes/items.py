@@ -1,75 +1,187 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlmodel import select
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app import crud
+from app.api.conditional import etag_matches, make_etag, not_modified, page_etag
+from app.api.deps import CurrentUser, CursorDep, SessionDep, SessionFactoryDep
+from app.api.export import ExportFormat, export_response
+from app.api.responses import FastJSONResponse, public_row, public_rows
+from app.core.config import settings
+from app.core.pagination import page_cursors
+from app.models import (
+    Item,
+    ItemBulkError,
+    ItemCreate,
+    ItemPublic,
+    ItemsBulkCreated,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+)
 
 router = APIRouter(prefix="/items", tags=["items"])
 
 
 @router.get("/", response_model=ItemsPublic)
-def read_items(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+async def read_items(
+    request: Request,
+    response: Response,
+    session: SessionDep,
+    current_user: CurrentUser,
+    cursors: CursorDep,
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve items.
-    """
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Item)
-        count = session.exec(count_statement).one()
-        statement = select(Item).offset(skip).limit(limit)
-        items = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Item)
-            .where(Item.owner_id == current_user.id)
+    Pass the ``next_cursor``/``previous_cursor`` of a page as ``after``/``before``
+    to page by keyset instead of ``skip``, which stays fast at any depth.
+    """
+    if skip and (cursors.after or cursors.before):
+        raise HTTPException(
+            status_code=400, detail="skip cannot be combined with a cursor"
         )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Item)
-            .where(Item.owner_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
+    owner_id = None if current_user.is_superuser else current_user.id
+
+    page = await crud.get_items_page_async(
+        session,
+        owner_id=owner_id,
+        skip=skip,
+        limit=limit,
+        after=cursors.after,
+        before=cursors.before,
+    )
+    etag = page_etag("items", owner_id, *page.total, request.url.query, rows=page.rows)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    fields = {
+        "count": page.total.count,
+        "count_estimated": page.total.estimated,
+        **page_cursors(
+            page.rows, limit, after=cursors.after, before=cursors.before, skip=skip
+        ),
+    }
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(
+            {"data": public_rows(page.rows, ItemPublic), **fields},
+            headers={"ETag": etag},
         )
-        items = session.exec(statement).all()
+    return ItemsPublic(data=page.rows, **fields)
+
 
-    return ItemsPublic(data=items, count=count)
+@router.get("/export", response_class=StreamingResponse)
+async def export_items(
+    session_factory: SessionFactoryDep,
+    current_user: CurrentUser,
+    format: ExportFormat = "ndjson",
+) -> StreamingResponse:
+    """
+    Stream all items (your own, unless superuser) as NDJSON or CSV.
+    """
+    statement = select(Item).order_by(Item.created_at, Item.id)
+    if not current_user.is_superuser:
+        statement = statement.where(Item.owner_id == current_user.id)
+    return export_response(session_factory, statement, ItemPublic, format, "items")
 
 
 @router.get("/{id}", response_model=ItemPublic)
-def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+async def read_item(
+    request: Request,
+    response: Response,
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+) -> Any:
     """
     Get item by ID.
     """
-    item = session.get(Item, id)
+    if "if-none-match" in request.headers:
+        # Revalidation only needs the owner and version, not the whole row
+        version = await crud.get_item_version_async(session, id)
+        if version is not None:
+            owner_id, updated_at = version
+            etag = make_etag(id, updated_at)
+            if (
+                current_user.is_superuser or owner_id == current_user.id
+            ) and etag_matches(request, etag):
+                return not_modified(etag)
+    item = await crud.get_item_async(session, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    etag = make_etag(item.id, item.updated_at)
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(public_row(item, ItemPublic), headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return item
 
 
 @router.post("/", response_model=ItemPublic)
-def create_item(
+async def create_item(
     *, session: SessionDep, current_user: CurrentUser, item_in: ItemCreate
 ) -> Any:
     """
     Create new item.
     """
-    item = Item.model_validate(item_in, update={"owner_id": current_user.id})
-    session.add(item)
-    session.commit()
-    session.refresh(item)
-    return item
+    return await crud.create_item_async(
+        session, item_create=item_in, owner_id=current_user.id
+    )
+
+
+@router.post("/bulk", response_model=ItemsBulkCreated)
+async def create_items_bulk(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    rows: list[Any] = Body(...),
+    partial: bool = False,
+) -> Any:
+    """
+    Create many items at once.
+
+    Every row is validated as an ``ItemCreate`` and the errors of invalid rows
+    are reported by their index. By default nothing is created if any row is
+    invalid; with ``partial=true`` the valid rows are created anyway.
+    """
+    if len(rows) > settings.ITEMS_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.ITEMS_BULK_MAX_ROWS} rows per request",
+        )
+    items: list[ItemCreate] = []
+    errors: list[ItemBulkError] = []
+    for index, row in enumerate(rows):
+        try:
+            items.append(ItemCreate.model_validate(row))
+        except ValidationError as e:
+            errors.append(
+                ItemBulkError(
+                    index=index,
+                    errors=e.errors(include_url=False, include_input=False),
+                )
+            )
+    if errors and not partial:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[error.model_dump() for error in errors],
+        )
+    ids = await crud.create_items_bulk_async(
+        session, items=items, owner_id=current_user.id
+    )
+    return ItemsBulkCreated(ids=ids, count=len(ids), errors=errors)
 
 
 @router.put("/{id}", response_model=ItemPublic)
-def update_item(
+async def update_item(
     *,
     session: SessionDep,
     current_user: CurrentUser,
@@ -79,31 +191,25 @@ def update_item(
     """
     Update an item.
     """
-    item = session.get(Item, id)
+    item = await crud.get_item_async(session, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    update_dict = item_in.model_dump(exclude_unset=True)
-    item.sqlmodel_update(update_dict)
-    session.add(item)
-    session.commit()
-    session.refresh(item)
-    return item
+    return await crud.update_item_async(session, item=item, item_update=item_in)
 
 
 @router.delete("/{id}")
-def delete_item(
+async def delete_item(
     session: SessionDep, current_user: CurrentUser, id: uuid.UUID
 ) -> Message:
     """
     Delete an item.
     """
-    item = session.get(Item, id)
+    item = await crud.get_item_async(session, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    session.delete(item)
-    session.commit()
+    await crud.delete_item_async(session, item=item)
     return Message(message="Item deleted successfully")
@@ -1,15 +1,28 @@
 import uuid
+from datetime import timedelta
+from typing import Any
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
 
 from app import crud
+from app.api.conditional import etag_matches, make_etag, not_modified, page_etag
 from app.api.deps import (
+    CursorDep,
     SessionDep,
+    SessionFactoryDep,
     get_current_active_superuser,
     get_current_active_user,
 )
+from app.api.export import ExportFormat, export_response
+from app.api.responses import FastJSONResponse, public_rows
+from app.api.routes.login import new_account_email
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.outbox import outbox_dispatcher
+from app.core.pagination import page_cursors
+from app.core.passwords import password_service
+from app.core.security import create_access_token
 from app.models import (
     Item,
     ItemCreate,
@@ -19,6 +32,7 @@ from app.models import (
     UpdatePassword,
     User,
     UserCreate,
+    UserPublic,
     UserRegister,
     UsersPublic,
     UserUpdate,
@@ -28,17 +42,64 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/", response_model=UsersPublic)
-def get_users(*, db: SessionDep, skip: int = 0, limit: int = 100) -> UsersPublic:
+async def get_users(
+    *,
+    request: Request,
+    response: Response,
+    db: SessionDep,
+    cursors: CursorDep,
+    skip: int = 0,
+    limit: int = 100,
+) -> Any:
     """
     Get all users.
+
+    Pass the ``next_cursor``/``previous_cursor`` of a page as ``after``/``before``
+    to page by keyset instead of ``skip``.
     """
-    users = crud.get_users(db, skip=skip, limit=limit)
-    count = crud.count_users(db)
-    return UsersPublic(data=users, count=count)
+    if skip and (cursors.after or cursors.before):
+        raise HTTPException(
+            status_code=400, detail="skip cannot be combined with a cursor"
+        )
+    page = await crud.get_users_page_async(
+        db, skip=skip, limit=limit, after=cursors.after, before=cursors.before
+    )
+    etag = page_etag("users", *page.total, request.url.query, rows=page.rows)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    fields = {
+        "count": page.total.count,
+        "count_estimated": page.total.estimated,
+        **page_cursors(
+            page.rows, limit, after=cursors.after, before=cursors.before, skip=skip
+        ),
+    }
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(
+            {"data": public_rows(page.rows, UserPublic), **fields},
+            headers={"ETag": etag},
+        )
+    return UsersPublic(data=page.rows, **fields)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def export_users(
+    session_factory: SessionFactoryDep, format: ExportFormat = "ndjson"
+) -> StreamingResponse:
+    """
+    Stream all users as NDJSON or CSV.
+    """
+    statement = select(User).order_by(User.created_at, User.id)
+    return export_response(session_factory, statement, UserPublic, format, "users")
 
 
 @router.post("/", response_model=User)
-def create_user(
+async def create_user(
     *,
     db: SessionDep,
     user_in: UserCreate,
@@ -47,18 +108,23 @@ def create_user(
     """
     Create new user with the privileges of superuser.
     """
-    user = crud.get_user_by_email(db, email=user_in.email)
+    user = await crud.get_user_by_email_async(db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="The user with this username already exists in the system.",
         )
-    user = crud.create_user(db, user_create=user_in)
+    emails = []
+    if settings.emails_enabled:
+        emails.append(new_account_email(email_to=user_in.email, username=user_in.email))
+    user = await crud.create_user_async(db, user_create=user_in, emails=emails)
+    if emails:
+        outbox_dispatcher.wake()
     return user
 
 
 @router.post("/open", response_model=User)
-def create_user_open(
+async def create_user_open(
     *,
     db: SessionDep,
     password: str = Body(...),
@@ -73,19 +139,19 @@ def create_user_open(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Open user registration is forbidden on this server.",
         )
-    user = crud.get_user_by_email(db, email=email)
+    user = await crud.get_user_by_email_async(db, email=email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="The user with this username already exists in the system.",
         )
     user_in = UserCreate(password=password, email=email, full_name=full_name)
-    user = crud.create_user(db, user_create=user_in)
+    user = await crud.create_user_async(db, user_create=user_in)
     return user
 
 
 @router.post("/signup", response_model=User)
-def register_user(*, db: SessionDep, user_in: UserRegister) -> User:
+async def register_user(*, db: SessionDep, user_in: UserRegister) -> User:
     """
     Register a new user.
     """
@@ -94,7 +160,7 @@ def register_user(*, db: SessionDep, user_in: UserRegister) -> User:
             status_code=403,
             detail="Open user registration is forbidden on this server.",
         )
-    user = crud.get_user_by_email(db, email=user_in.email)
+    user = await crud.get_user_by_email_async(db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
@@ -105,22 +171,29 @@ def register_user(*, db: SessionDep, user_in: UserRegister) -> User:
         password=user_in.password,
         full_name=user_in.full_name,
     )
-    user = crud.create_user(db, user_create=user_create)
+    user = await crud.create_user_async(db, user_create=user_create)
     return user
 
 
 @router.get("/me", response_model=User)
-def read_user_me(
-    _db: SessionDep, current_user: User = Depends(get_current_active_user)
-) -> User:
+async def read_user_me(
+    request: Request,
+    response: Response,
+    _db: SessionDep,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
     """
     Get current user.
     """
+    etag = make_etag(current_user.id, current_user.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return current_user
 
 
 @router.patch("/me", response_model=User)
-def update_user_me(
+async def update_user_me(
     *,
     db: SessionDep,
     password: str = Body(None),
@@ -140,27 +213,31 @@ def update_user_me(
     if email is not None:
         # Check if email is being updated and if it already exists
         if email != current_user.email:
-            existing_user = crud.get_user_by_email(db, email=email)
+            existing_user = await crud.get_user_by_email_async(db, email=email)
             if existing_user:
                 raise HTTPException(
                     status_code=409,
                     detail="User with this email already exists",
                 )
         user_in.email = email
-    user = crud.update_user(db, db_user=current_user, user_in=user_in)
+    user = await crud.update_user_async(db, db_user=current_user, user_in=user_in)
     return user
 
 
 @router.get("/me/refresh-token", response_model=Token)
-def refresh_token(current_user: User = Depends(get_current_active_user)) -> Token:
+async def refresh_token(current_user: User = Depends(get_current_active_user)) -> Token:
     """
     Get new tokens for user.
     """
-    return crud.create_access_token(subject=current_user.id)
+    access_token = create_access_token(
+        subject=current_user.email,
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return Token(access_token=access_token)
 
 
 @router.patch("/me/password", response_model=Message)
-def update_password_me(
+async def update_password_me(
     *,
     db: SessionDep,
     password_data: UpdatePassword,
@@ -169,7 +246,7 @@ def update_password_me(
     """
     Update current user password.
     """
-    if not verify_password(
+    if not await password_service.verify(
         password_data.current_password, current_user.hashed_password
     ):
         raise HTTPException(
@@ -183,17 +260,15 @@ def update_password_me(
             detail="New password cannot be the same as the current password",
         )
 
-    hashed_password = get_password_hash(password_data.new_password)
-    current_user.hashed_password = hashed_password
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    await crud.update_user_async(
+        db, db_user=current_user, user_in={"password": password_data.new_password}
+    )
 
     return Message(message="Password updated successfully")
 
 
 @router.delete("/me", response_model=Message)
-def delete_user_me(
+async def delete_user_me(
     *,
     db: SessionDep,
     current_user: User = Depends(get_current_active_user),
@@ -206,12 +281,12 @@ def delete_user_me(
             status_code=403,
             detail="Super users are not allowed to delete themselves",
         )
-    crud.delete_user(db, user_id=current_user.id)
+    await crud.delete_user_async(db, user_id=current_user.id)
     return Message(message="User deleted successfully")
 
 
 @router.get("/{user_id}", response_model=User)
-def read_user_by_id(
+async def read_user_by_id(
     user_id: uuid.UUID,
     db: SessionDep,
     current_user: User = Depends(get_current_active_user),
@@ -219,7 +294,7 @@ def read_user_by_id(
     """
     Get a specific user by id.
     """
-    user = crud.get_user(db, user_id=user_id)
+    user = await crud.get_user_async(db, user_id=user_id)
     if user == current_user:
         return user
     if not current_user.is_superuser:
@@ -231,7 +306,7 @@ def read_user_by_id(
 
 
 @router.patch("/{user_id}", response_model=User)
-def update_user(
+async def update_user(
     *,
     db: SessionDep,
     user_id: uuid.UUID,
@@ -241,7 +316,7 @@ def update_user(
     """
     Update a user.
     """
-    user = crud.get_user(db, user_id=user_id)
+    user = await crud.get_user_async(db, user_id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -250,19 +325,19 @@ def update_user(
 
     # Check if email is being updated and if it already exists
     if user_in.email is not None and user_in.email != user.email:
-        existing_user = crud.get_user_by_email(db, email=user_in.email)
+        existing_user = await crud.get_user_by_email_async(db, email=user_in.email)
         if existing_user:
             raise HTTPException(
                 status_code=409,
                 detail="User with this email already exists",
             )
 
-    user = crud.update_user(db, db_user=user, user_in=user_in)
+    user = await crud.update_user_async(db, db_user=user, user_in=user_in)
     return user
 
 
 @router.delete("/{user_id}", response_model=Message)
-def delete_user(
+async def delete_user(
     *,
     db: SessionDep,
     user_id: uuid.UUID,
@@ -271,7 +346,7 @@ def delete_user(
     """
     Delete a user.
     """
-    user = crud.get_user(db, user_id=user_id)
+    user = await crud.get_user_async(db, user_id=user_id)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -282,31 +357,31 @@ def delete_user(
             status_code=403,
             detail="Super users are not allowed to delete themselves",
         )
-    crud.delete_user(db, user_id=user.id)
+    await crud.delete_user_async(db, user_id=user.id)
     return Message(message="User deleted successfully")
 
 
 @router.get("/me/items/")
-def read_user_items(
+async def read_user_items(
     db: SessionDep,
     current_user: User = Depends(get_current_active_user),
 ) -> list[Item]:
     """
     Get all items for the current user.
     """
-    return crud.get_user_items(db, user_id=current_user.id)
+    return await crud.get_items_async(db, owner_id=current_user.id)
 
 
 @router.get("/me/items/{item_id}")
-def read_user_item(
-    item_id: int,
+async def read_user_item(
+    item_id: uuid.UUID,
     db: SessionDep,
     current_user: User = Depends(get_current_active_user),
 ) -> Item:
     """
     Get a specific item for the current user.
     """
-    item = crud.get_item(db, item_id=item_id)
+    item = await crud.get_item_async(db, item_id=item_id)
     if not item:
         raise HTTPException(
             status_code=404,
@@ -321,7 +396,7 @@ def read_user_item(
 
 
 @router.post("/me/items/")
-def create_user_item(
+async def create_user_item(
     *,
     db: SessionDep,
     item_in: ItemCreate,
@@ -330,21 +405,23 @@ def create_user_item(
     """
     Create a new item for the current user.
     """
-    return crud.create_user_item(db, item_in=item_in, user_id=current_user.id)
+    return await crud.create_item_async(
+        db, item_create=item_in, owner_id=current_user.id
+    )
 
 
 @router.put("/me/items/{item_id}")
-def update_user_item(
+async def update_user_item(
     *,
     db: SessionDep,
-    item_id: int,
+    item_id: uuid.UUID,
     item_in: ItemUpdate,
     current_user: User = Depends(get_current_active_user),
 ) -> Item:
     """
     Update a specific item for the current user.
     """
-    item = crud.get_item(db, item_id=item_id)
+    item = await crud.get_item_async(db, item_id=item_id)
     if not item:
         raise HTTPException(
             status_code=404,
@@ -355,20 +432,20 @@ def update_user_item(
             status_code=403,
             detail="The user doesn't have enough privileges",
         )
-    return crud.update_item(db, db_obj=item, obj_in=item_in)
+    return await crud.update_item_async(db, item=item, item_update=item_in)
 
 
 @router.delete("/me/items/{item_id}")
-def delete_user_item(
+async def delete_user_item(
     *,
     db: SessionDep,
-    item_id: int,
+    item_id: uuid.UUID,
     current_user: User = Depends(get_current_active_user),
 ) -> Message:
     """
     Delete a specific item for the current user.
     """
-    item = crud.get_item(db, item_id=item_id)
+    item = await crud.get_item_async(db, item_id=item_id)
     if not item:
         raise HTTPException(
             status_code=404,
@@ -379,5 +456,5 @@ def delete_user_item(
             status_code=403,
             detail="The user doesn't have enough privileges",
         )
-    crud.delete_item(db, item=item)
+    await crud.delete_item_async(db, item=item)
     return Message(message="The item has been successfully deleted")
@@ -2,13 +2,16 @@ from typing import Any
 
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
-from sqlalchemy import text
 
-from app.api.deps import get_current_active_superuser
+from app import crud
+from app.api.deps import SessionDep, get_current_active_superuser
 from app.core.config import settings
-from app.db.session import get_session
+from app.core.db import async_engine, engine, replica_set
+from app.core.health import dependency_registry
+from app.core.passwords import password_service
+from app.db.pool import pool_status
 from app.models import Message
-from app.utils import generate_test_email, send_email
+from app.utils import generate_test_email, send_email_async
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -18,12 +21,12 @@ router = APIRouter(prefix="/utils", tags=["utils"])
     dependencies=[Depends(get_current_active_superuser)],
     status_code=201,
 )
-def test_email(email_to: EmailStr) -> Message:
+async def test_email(email_to: EmailStr) -> Message:
     """
     Test emails.
     """
     email_data = generate_test_email(email_to=email_to)
-    send_email(
+    await send_email_async(
         email_to=email_to,
         subject=email_data.subject,
         html_content=email_data.html_content,
@@ -31,24 +34,68 @@ def test_email(email_to: EmailStr) -> Message:
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/db-pool/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def db_pool() -> dict[str, Any]:
+    """
+    Connection pool gauges and counters for each engine, and replica health.
+    """
+    return {
+        "async": pool_status(async_engine.sync_engine.pool),
+        "sync": pool_status(engine.pool),
+        "replicas": [
+            {**replica.status(), **pool_status(replica.engine.sync_engine.pool)}
+            for replica in replica_set.replicas
+        ],
+    }
+
+
+@router.get(
+    "/caches/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def caches() -> dict[str, Any]:
+    """
+    Size and hit/miss counters of the in-process caches of this worker.
+    """
+    return {
+        "principals": crud.principal_cache.stats(),
+        "totals": crud.totals_cache.stats(),
+    }
+
+
+@router.get(
+    "/password-hashes/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def password_hashes(session: SessionDep) -> dict[str, Any]:
+    """
+    Current bcrypt cost and the scheme/cost distribution of stored hashes.
+    """
+    return {
+        "target_ms": password_service.target_ms,
+        "service": password_service.stats(),
+        "hashes": await crud.get_password_hash_stats_async(session),
+    }
+
+
 @router.get("/health-check/")
 async def health_check() -> dict[str, Any]:
     """
     Health check endpoint that returns system status.
     """
-    try:
-        # Add database connection check
-        with next(get_session()) as db:
-            db.execute(text("SELECT 1"))
-
-        return {
-            "status": "healthy",
-            "service": {
-                "name": settings.PROJECT_NAME,
-                "version": "1.0.0",
-                "environment": settings.ENVIRONMENT,
-            },
-            "system": {"database": "connected", "dependencies": "healthy"},
-        }
-    except Exception as e:
-        return {"status": "unhealthy", "error": str(e)}
+    # Latest background probes, see app.core.health
+    if not dependency_registry.ready:
+        return {"status": "unhealthy", "dependencies": dependency_registry.status()}
+    return {
+        "status": "healthy",
+        "service": {
+            "name": settings.PROJECT_NAME,
+            "version": "1.0.0",
+            "environment": settings.ENVIRONMENT,
+        },
+        "system": {"database": "connected", "dependencies": "healthy"},
+        "dependencies": dependency_registry.status(),
+    }
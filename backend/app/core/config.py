@@ -76,6 +76,86 @@ class Settings(BaseSettings):
         )
         return PostgresDsn(str(url))
 
+    # Connection pool, sized per worker process: the total across workers,
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW), must stay below the
+    # server's max_connections.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Optional read replicas. Safe (GET/HEAD) requests are served from a
+    # healthy replica, unless the same client wrote within
+    # DB_READ_YOUR_WRITES_SECONDS; replicas lagging more than
+    # DB_REPLICA_MAX_LAG_SECONDS are ejected until they catch up.
+    DB_REPLICA_URIS: Annotated[
+        list[PostgresDsn] | str, BeforeValidator(parse_cors)
+    ] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0
+    DB_REPLICA_CHECK_TIMEOUT: float = 2.0
+    DB_READ_YOUR_WRITES_SECONDS: float = 10.0
+
+    # Listing totals are cached per scope and invalidated on create/delete.
+    # When COUNT_ESTIMATE_MIN_ROWS is set, unscoped totals of tables larger
+    # than that are served from the planner estimate (pg_class.reltuples).
+    COUNT_CACHE_TTL_SECONDS: float = 30.0
+    COUNT_CACHE_MAXSIZE: int = 10_000
+    COUNT_ESTIMATE_MIN_ROWS: int | None = None
+
+    # Authenticated users are cached per worker by token subject, saving the
+    # user lookup on most requests. Updates and deletes invalidate the local
+    # entry; other workers keep serving theirs, including a deactivated user
+    # or a replaced password hash, for up to the TTL, so keep it short. Set
+    # the TTL to 0 to disable the cache.
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 5.0
+    PRINCIPAL_CACHE_MAXSIZE: int = 10_000
+    # bcrypt runs in a process pool of PASSWORD_HASH_WORKERS processes (one
+    # per CPU by default). At most PASSWORD_HASH_MAX_PENDING further jobs may
+    # wait for a worker; beyond that requests fail fast with 503.
+    PASSWORD_HASH_WORKERS: int | None = None
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    # The bcrypt cost is calibrated at startup so that a hash takes about
+    # PASSWORD_HASH_TARGET_MS; PASSWORD_HASH_ROUNDS pins it instead. Hashes
+    # of any other cost are rehashed on the next successful login.
+    PASSWORD_HASH_TARGET_MS: float = 250.0
+    PASSWORD_HASH_ROUNDS: int | None = None
+    # Login attempts allowed per email and per client IP within the window;
+    # a successful login resets its email's count and is not held against
+    # its IP.
+    # Set LOGIN_THROTTLE_REDIS_URL to share the counts between workers.
+    LOGIN_THROTTLE_WINDOW_SECONDS: float = 300.0
+    LOGIN_THROTTLE_MAX_PER_EMAIL: int = 5
+    LOGIN_THROTTLE_MAX_PER_IP: int = 50
+    LOGIN_THROTTLE_MAXKEYS: int = 100_000
+    LOGIN_THROTTLE_REDIS_URL: str | None = None
+    # Verified access tokens, each kept until its own expiry at most
+    TOKEN_CACHE_MAXSIZE: int = 10_000
+
+    # POST /items/bulk accepts up to ITEMS_BULK_MAX_ROWS rows; on PostgreSQL,
+    # batches of at least ITEMS_BULK_COPY_MIN_ROWS are loaded with COPY
+    ITEMS_BULK_MAX_ROWS: int = 10_000
+    ITEMS_BULK_COPY_MIN_ROWS: int = 1_000
+    # Serve the hot read routes through the orjson fast path (app.api.responses)
+    FAST_JSON_RESPONSES: bool = False
+    # Rows fetched per server-side cursor round trip by the export endpoints
+    EXPORT_BATCH_SIZE: int = 1_000
+
+    # Logs are written as JSON lines by a background thread. 4xx/5xx and
+    # requests slower than ACCESS_LOG_SLOW_MS are always logged, other
+    # requests at ACCESS_LOG_SAMPLE_RATE. Past LOG_QUEUE_MAXSIZE pending
+    # records, new ones are dropped rather than blocking requests.
+    LOG_LEVEL: str = "INFO"
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_SLOW_MS: float = 1_000.0
+    LOG_QUEUE_MAXSIZE: int = 10_000
+    # /health reports system usage sampled in the background at this interval
+    HEALTH_SAMPLE_INTERVAL_SECONDS: float = 5.0
+    # Readiness reports the latest background probe of each dependency
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -84,6 +164,24 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str | None = None
     EMAILS_FROM_EMAIL: EmailStr | None = None
     EMAILS_FROM_NAME: EmailStr | None = None
+    # Emails are sent over up to SMTP_POOL_SIZE persistent sessions, in
+    # batches of up to SMTP_BATCH_SIZE messages per session
+    SMTP_POOL_SIZE: int = 2
+    SMTP_BATCH_SIZE: int = 50
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+    # Account and recovery emails go through the email_outbox table. The
+    # dispatcher claims up to EMAIL_OUTBOX_BATCH_SIZE due emails at a time,
+    # sends them over EMAIL_OUTBOX_CONCURRENCY sessions, and retries failures
+    # with exponential backoff until EMAIL_OUTBOX_MAX_ATTEMPTS, after which
+    # they are kept as dead letters. Claimed emails are retried after
+    # EMAIL_OUTBOX_LEASE_SECONDS if their dispatcher dies.
+    EMAIL_OUTBOX_BATCH_SIZE: int = 100
+    EMAIL_OUTBOX_CONCURRENCY: int = 2
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_SECONDS: float = 30.0
+    EMAIL_OUTBOX_BACKOFF_MAX_SECONDS: float = 3_600.0
+    EMAIL_OUTBOX_LEASE_SECONDS: float = 300.0
 
     @model_validator(mode="after")
     def _set_default_emails_from(self) -> Self:
@@ -103,7 +201,7 @@ class Settings(BaseSettings):
     FIRST_SUPERUSER_PASSWORD: str
     USERS_OPEN_REGISTRATION: bool = True
 
-    # Email templates directory
+    # Email templates directory; emails are rendered from its build/ folder
     EMAIL_TEMPLATES_DIR: Path = Path(__file__).parent.parent / "email-templates"
     SERVER_HOST: str = "http://localhost:8000"
 
@@ -1,20 +1,68 @@
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine, select
 
 from app.core.config import settings
 from app.core.security import get_password_hash
+from app.db.pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    instrument_pool,
+)
+from app.db.replicas import ReplicaSet
 from app.models import User
 from app.schemas import UserCreate
 
 # Create database URL
 database_url = str(settings.SQLALCHEMY_DATABASE_URI)
 
-# Create async engine
+pool_options = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
+# Create sync engine, used by Alembic, init_db and the CLI scripts
 engine = create_engine(
     database_url,
     echo=settings.ENVIRONMENT == "local",
     connect_args={"check_same_thread": False}
     if database_url.startswith("sqlite")
     else {},
+    poolclass=InstrumentedQueuePool,
+    **pool_options,
+)
+
+# Create async engine, used by the request path. The psycopg 3 dialect
+# selects its async driver automatically under create_async_engine.
+async_engine = create_async_engine(
+    database_url,
+    echo=settings.ENVIRONMENT == "local",
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    **pool_options,
+)
+
+instrument_pool(engine.pool)
+instrument_pool(async_engine.sync_engine.pool)
+
+# Read replicas, used by the routing session for safe requests
+replica_engines = [
+    create_async_engine(
+        str(uri), poolclass=InstrumentedAsyncAdaptedQueuePool, **pool_options
+    )
+    for uri in settings.DB_REPLICA_URIS
+]
+for replica_engine in replica_engines:
+    instrument_pool(replica_engine.sync_engine.pool)
+
+replica_set = ReplicaSet(
+    replica_engines,
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
+    check_timeout=settings.DB_REPLICA_CHECK_TIMEOUT,
+    read_your_writes_window=settings.DB_READ_YOUR_WRITES_SECONDS,
 )
 
 
@@ -29,7 +77,7 @@ def engine_connect(engine) -> None:
 def init_db(session: Session) -> None:
     """Initialize database with first superuser."""
     user = session.exec(
-        select(User).where(User.email == settings.FIRST_SUPERUSER)
+        select(User).where(func.lower(User.email) == settings.FIRST_SUPERUSER.lower())
     ).first()
     if not user:
         user_in = UserCreate(
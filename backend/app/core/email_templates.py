@@ -0,0 +1,75 @@
+"""
+Compiled email templates.
+
+Every template in ``email-templates/build`` is read and compiled once, and
+emails are rendered from the compiled objects.
+
+Modules that send email declare the templates they use with ``require`` at
+import time; loading fails if any of them is missing, so a bad reference is
+caught at startup rather than when the first email is sent.
+"""
+
+import threading
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+from app.core.config import settings
+
+
+class EmailTemplateError(Exception):
+    """Raised when a required email template does not exist."""
+
+
+class EmailTemplates:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.required: set[str] = set()
+        self._templates: dict[str, Template] | None = None
+        self._lock = threading.Lock()
+
+    def require(self, name: str) -> str:
+        """Declare that ``name`` must exist, and return it."""
+        self.required.add(name)
+        if self._templates is not None and name not in self._templates:
+            raise EmailTemplateError(f"Email template {name} not found")
+        return name
+
+    def load(self) -> None:
+        """Compile every template and check the required ones exist."""
+        with self._lock:
+            if self._templates is not None:
+                return
+            env = Environment(
+                loader=FileSystemLoader(self.directory),
+                autoescape=select_autoescape(["html"]),
+                auto_reload=False,
+            )
+            templates: dict[str, Template] = {}
+            for path in sorted(self.directory.glob("*.html")):
+                templates[path.name] = env.from_string(path.read_text())
+            missing = sorted(self.required - templates.keys())
+            if missing:
+                raise EmailTemplateError(
+                    f"Email templates not found in {self.directory}: "
+                    + ", ".join(missing)
+                )
+            self._templates = templates
+
+    @property
+    def names(self) -> list[str]:
+        self.load()
+        assert self._templates is not None
+        return sorted(self._templates)
+
+    def render(self, name: str, /, **context: object) -> str:
+        self.load()
+        assert self._templates is not None
+        try:
+            template = self._templates[name]
+        except KeyError:
+            raise EmailTemplateError(f"Email template {name} not found") from None
+        return template.render(**context)
+
+
+email_templates = EmailTemplates(settings.EMAIL_TEMPLATES_DIR / "build")
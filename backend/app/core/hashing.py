@@ -0,0 +1,77 @@
+"""
+Password hashing primitives.
+
+This module must not import the application settings: it is what the
+password worker processes import, and they should start quickly and
+without needing the app's configuration.
+"""
+
+import time
+
+from passlib.context import CryptContext
+
+# Bounds for the calibrated bcrypt cost
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+# New hashes use bcrypt. sha256_crypt hashes written by an old fallback still
+# verify and are replaced on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt", "sha256_crypt"], deprecated=["sha256_crypt"]
+)
+
+
+def configure(rounds: int) -> None:
+    """Hash with cost ``rounds``; bcrypt hashes of any other cost are outdated.
+
+    Costlier hashes are replaced on the next login as well, so verifying one
+    stays within the calibrated time.
+    """
+    pwd_context.update(
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def calibrate_rounds(
+    target_ms: float, min_rounds: int = MIN_ROUNDS, max_rounds: int = MAX_ROUNDS
+) -> int:
+    """Return the highest bcrypt cost whose hashes take at most ``target_ms``.
+
+    Each extra round doubles the work, so timing ``min_rounds`` is enough to
+    extrapolate. The fastest of a few runs is used to ignore warm-up noise.
+    """
+    bcrypt = pwd_context.handler("bcrypt").using(rounds=min_rounds)
+    elapsed_ms = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        bcrypt.hash("calibration")
+        elapsed_ms = min(elapsed_ms, (time.perf_counter() - start) * 1000)
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    return rounds
+
+
+def needs_update(hashed_password: str) -> bool:
+    """Whether a hash uses a deprecated scheme or other than the current cost."""
+    return pwd_context.needs_update(hashed_password)
+
+
+def scheme_and_cost(hashed_password: str) -> tuple[str, int | None]:
+    """Identify the scheme and cost of a hash from its ``$id$cost$`` prefix."""
+    if hashed_password.startswith(("$2a$", "$2b$", "$2y$")):
+        return "bcrypt", int(hashed_password[4:6])
+    if hashed_password.startswith("$5$"):
+        return "sha256_crypt", None
+    return "unknown", None
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    return pwd_context.hash(password)
@@ -0,0 +1,182 @@
+"""
+Health information served by the /health endpoints.
+
+Health probes arrive constantly, so they must not do any blocking work.
+``SystemSampler`` refreshes CPU, memory and disk usage in the background, and
+``DependencyRegistry`` probes the database and other services the same way,
+each probe bounded by a timeout. The endpoints return the latest results.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import psutil
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.db import async_engine
+
+logger = logging.getLogger(__name__)
+
+# Usage above this percentage marks the system as degraded
+RESOURCE_LIMIT_PERCENT = 90.0
+
+
+class SystemSampler:
+    """Periodically sample system resource usage off the event loop."""
+
+    def __init__(self, interval: float, disk_path: str = os.path.abspath(os.sep)):
+        self.interval = interval
+        self.disk_path = disk_path
+        self._snapshot: dict[str, Any] | None = None
+        # cpu_percent() without an interval reports usage since its last
+        # call; this first call sets the baseline for the first sample.
+        psutil.cpu_percent(interval=None)
+
+    def sample(self) -> dict[str, Any]:
+        memory = psutil.virtual_memory().percent
+        cpu = psutil.cpu_percent(interval=None)
+        disk = psutil.disk_usage(self.disk_path).percent
+        self._snapshot = {
+            "status": "degraded"
+            if max(memory, cpu, disk) > RESOURCE_LIMIT_PERCENT
+            else "healthy",
+            "memory_usage_percent": memory,
+            "cpu_usage_percent": cpu,
+            "disk_usage_percent": disk,
+            "sampled_at": time.time(),
+        }
+        return self._snapshot
+
+    async def monitor(self) -> None:
+        """Take a sample each ``interval`` seconds, forever."""
+        while True:
+            await asyncio.to_thread(self.sample)
+            await asyncio.sleep(self.interval)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the latest sample and its age, without sampling."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"status": "unknown", "message": "No sample taken yet"}
+        age = time.time() - snapshot["sampled_at"]
+        data = {**snapshot, "age_s": round(age, 3)}
+        # The sampler has stopped or is stuck; the figures are not current
+        if age > 3 * self.interval:
+            data["status"] = "stale"
+        return data
+
+
+class Dependency:
+    def __init__(
+        self, name: str, probe: Callable[[], Awaitable[None]], critical: bool
+    ) -> None:
+        self.name = name
+        self.probe = probe
+        self.critical = critical
+        self.healthy: bool | None = None
+        self.latency_ms: float | None = None
+        self.last_checked: float | None = None
+        self.last_error: str | None = None
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "critical": self.critical,
+            "latency_ms": self.latency_ms,
+            "last_checked": self.last_checked,
+            "last_error": self.last_error,
+        }
+
+
+class DependencyRegistry:
+    """Probe external dependencies in the background and keep the results.
+
+    The service is ready once every critical dependency passed its latest
+    probe. Non-critical ones are reported but do not affect readiness.
+    """
+
+    def __init__(self, interval: float, timeout: float) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.dependencies: dict[str, Dependency] = {}
+
+    def register(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[None]],
+        critical: bool = True,
+    ) -> None:
+        self.dependencies[name] = Dependency(name, probe, critical)
+
+    async def check(self, dependency: Dependency) -> None:
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout):
+                await dependency.probe()
+        except Exception as e:
+            if dependency.healthy is not False:
+                logger.warning(f"Dependency {dependency.name} is unhealthy: {e!r}")
+            dependency.healthy = False
+            dependency.last_error = repr(e)
+        else:
+            if dependency.healthy is False:
+                logger.info(f"Dependency {dependency.name} is healthy again")
+            dependency.healthy = True
+            dependency.last_error = None
+        finally:
+            dependency.latency_ms = round((time.perf_counter() - start) * 1000, 3)
+            dependency.last_checked = time.time()
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(d) for d in self.dependencies.values()))
+
+    async def monitor(self) -> None:
+        """Probe every dependency each ``interval`` seconds, forever."""
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.interval)
+
+    @property
+    def ready(self) -> bool:
+        return all(d.healthy for d in self.dependencies.values() if d.critical)
+
+    def status(self) -> dict[str, dict[str, Any]]:
+        return {name: d.status() for name, d in self.dependencies.items()}
+
+
+async def check_database() -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_smtp() -> None:
+    """Connect to the SMTP server and expect its 220 greeting."""
+    assert settings.SMTP_HOST
+    reader, writer = await asyncio.open_connection(
+        settings.SMTP_HOST, settings.SMTP_PORT, ssl=settings.SMTP_SSL or None
+    )
+    try:
+        greeting = await reader.readline()
+        if not greeting.startswith(b"220"):
+            raise ConnectionError(f"Unexpected SMTP greeting: {greeting!r}")
+        writer.write(b"QUIT\r\n")
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+system_sampler = SystemSampler(interval=settings.HEALTH_SAMPLE_INTERVAL_SECONDS)
+
+dependency_registry = DependencyRegistry(
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+)
+dependency_registry.register("database", check_database)
+if settings.emails_enabled:
+    # Mail can be retried later; an SMTP outage should not stop serving
+    dependency_registry.register("smtp", check_smtp, critical=False)
@@ -0,0 +1,176 @@
+"""
+Structured, non-blocking logging.
+
+Log records are put on a bounded in-memory queue and written as JSON lines by
+a ``QueueListener`` thread, so request handlers never wait on stdout. If the
+writer falls behind and the queue fills up, new records are dropped and
+counted instead of blocking the event loop.
+
+``RequestLoggingMiddleware`` emits one record per request to the
+``app.access`` logger. Errors and slow requests are always logged; the rest
+are sampled, and nothing is built for the requests that are skipped.
+"""
+
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+access_logger = logging.getLogger("app.access")
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record; ``extra={"fields": {...}}`` is merged in."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(getattr(record, "fields", ()))
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue records as they are and drop them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue[logging.LogRecord]) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so records need no pickling and
+        # are formatted on its thread rather than the caller's.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogWriter:
+    """Route the root logger through a queue to a background JSON writer."""
+
+    def __init__(self, level: str = "INFO", maxsize: int = 10_000) -> None:
+        self.level = level
+        self.maxsize = maxsize
+        self._queue: queue.Queue[logging.LogRecord] | None = None
+        self._handler: DroppingQueueHandler | None = None
+        self._listener: QueueListener | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._listener is not None:
+                return
+            output = logging.StreamHandler(sys.stdout)
+            output.setFormatter(JSONFormatter())
+            self._queue = queue.Queue(self.maxsize)
+            self._handler = DroppingQueueHandler(self._queue)
+            self._listener = QueueListener(self._queue, output)
+            root = logging.getLogger()
+            root.addHandler(self._handler)
+            root.setLevel(self.level)
+            self._listener.start()
+
+    def stop(self) -> None:
+        """Detach from the root logger and write out the queued records."""
+        with self._lock:
+            handler, self._handler = self._handler, None
+            listener, self._listener = self._listener, None
+        if handler is not None:
+            logging.getLogger().removeHandler(handler)
+        if listener is not None:
+            listener.stop()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "dropped": self._handler.dropped if self._handler else 0,
+        }
+
+
+class RequestLoggingMiddleware:
+    """Log method, path, status and duration of sampled requests."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        sample_rate: float | None = None,
+        slow_ms: float | None = None,
+    ) -> None:
+        self.app = app
+        self.sample_rate = (
+            settings.ACCESS_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+        )
+        self.slow_seconds = (
+            settings.ACCESS_LOG_SLOW_MS if slow_ms is None else slow_ms
+        ) / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            if (
+                status_code >= 400
+                or duration >= self.slow_seconds
+                or random.random() < self.sample_rate
+            ):
+                self._log(scope, status_code, duration)
+
+    def _log(self, scope: Scope, status_code: int, duration: float) -> None:
+        if status_code >= 500:
+            level = logging.ERROR
+        elif status_code >= 400:
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+        client = scope.get("client")
+        access_logger.log(
+            level,
+            "request",
+            extra={
+                "fields": {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope["query_string"].decode("latin-1"),
+                    "status": status_code,
+                    "duration_ms": round(duration * 1000, 3),
+                    "client": client[0] if client else None,
+                }
+            },
+        )
+
+
+log_writer = LogWriter(level=settings.LOG_LEVEL, maxsize=settings.LOG_QUEUE_MAXSIZE)
@@ -0,0 +1,170 @@
+"""
+Outgoing mail over pooled SMTP sessions.
+
+Sending an ``emails.Message`` with a dict of SMTP options connects, negotiates
+TLS and logs in for that one message. ``SMTPPool`` instead keeps up to
+``size`` sessions open and sends batches of messages over one session; a
+session the server has dropped is reopened on its next use.
+
+``Mailer`` is the async front end: ``submit`` queues a message and returns at
+once, and one worker task per pooled session sends whatever has accumulated,
+up to ``batch_size`` messages at a time, from a thread.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+import emails
+from emails.backend.response import SMTPResponse
+from emails.backend.smtp import SMTPBackend
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A queued message and the future resolved with its delivery response
+Outgoing = tuple[emails.Message, asyncio.Future[SMTPResponse]]
+
+
+class SMTPPool:
+    def __init__(self, size: int, **options: Any) -> None:
+        self.size = size
+        self.options = options
+        self._idle: queue.LifoQueue[SMTPBackend] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+
+    @contextmanager
+    def session(self) -> Iterator[SMTPBackend]:
+        """Borrow a session, waiting while all ``size`` of them are in use."""
+        with self._slots:
+            try:
+                backend = self._idle.get_nowait()
+            except queue.Empty:
+                backend = SMTPBackend(**self.options)
+            try:
+                yield backend
+            except BaseException:
+                backend.close()
+                raise
+            self._idle.put(backend)
+
+    def send_batch(self, messages: Sequence[emails.Message]) -> list[SMTPResponse]:
+        """Send ``messages`` in order over a single session."""
+        with self.session() as backend:
+            responses = [message.send(smtp=backend) for message in messages]
+        with self._lock:
+            for response in responses:
+                if response.success:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+        return responses
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "sent": self.sent,
+                "failed": self.failed,
+            }
+
+
+class Mailer:
+    def __init__(self, pool: SMTPPool, batch_size: int) -> None:
+        self.pool = pool
+        self.batch_size = batch_size
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[Outgoing] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Workers belong to the loop that started them
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._workers = [
+                asyncio.create_task(self._work(self._queue))
+                for _ in range(self.pool.size)
+            ]
+
+    def submit(self, message: emails.Message) -> asyncio.Future[SMTPResponse]:
+        """Queue ``message`` and return a future for its delivery response.
+
+        Must be called from the event loop; the workers start on first use.
+        """
+        self.start()
+        assert self._queue is not None
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((message, future))
+        return future
+
+    async def _work(self, pending: asyncio.Queue[Outgoing]) -> None:
+        while True:
+            batch = [await pending.get()]
+            while len(batch) < self.batch_size and not pending.empty():
+                batch.append(pending.get_nowait())
+            try:
+                responses = await asyncio.to_thread(
+                    self.pool.send_batch, [message for message, _ in batch]
+                )
+            except Exception as e:
+                logger.exception(f"Sending a batch of {len(batch)} emails failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), response in zip(batch, responses, strict=True):
+                    if not response.success:
+                        logger.warning(f"Email not sent: {response!r}")
+                    if not future.done():
+                        future.set_result(response)
+            finally:
+                for _ in batch:
+                    pending.task_done()
+
+    async def stop(self) -> None:
+        """Send the queued messages, then stop the workers and close the pool."""
+        if self._queue is not None:
+            await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        self._loop = None
+        self._queue = None
+        self._workers = []
+        await asyncio.to_thread(self.pool.close)
+
+
+def smtp_options() -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "host": settings.SMTP_HOST,
+        "port": settings.SMTP_PORT,
+        "ssl": settings.SMTP_SSL,
+        "tls": settings.SMTP_TLS and not settings.SMTP_SSL,
+        "timeout": settings.SMTP_TIMEOUT_SECONDS,
+    }
+    if settings.SMTP_USER:
+        options["user"] = settings.SMTP_USER
+    if settings.SMTP_PASSWORD:
+        options["password"] = settings.SMTP_PASSWORD
+    return options
+
+
+smtp_pool = SMTPPool(settings.SMTP_POOL_SIZE, **smtp_options())
+mailer = Mailer(smtp_pool, batch_size=settings.SMTP_BATCH_SIZE)
@@ -0,0 +1,104 @@
+"""
+Prometheus metrics for HTTP requests.
+
+``MetricsMiddleware`` records a latency histogram, a request counter and an
+in-progress gauge. Requests are labelled by route template (``/items/{id}``)
+rather than raw path, so the number of series stays bounded; requests that
+match no route share the ``<unmatched>`` label.
+
+With several worker processes, set ``PROMETHEUS_MULTIPROC_DIR`` to an empty,
+writable directory before the app starts. Each worker then writes its samples
+to files in it and ``/metrics`` aggregates all of them, whichever worker
+serves the scrape. The directory must be emptied between deployments.
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the end of its response.",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being processed.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+
+def multiprocess_mode() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Return the exposition text for this process, or for all workers."""
+    if multiprocess_mode():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the aggregate when it exits."""
+    if multiprocess_mode():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def _route_template(scope: Scope) -> str:
+    # Set on the scope by the router once a route has matched
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            route = _route_template(scope)
+            REQUEST_DURATION.labels(method, route).observe(duration)
+            REQUESTS.labels(method, route, str(status_code)).inc()
@@ -0,0 +1,195 @@
+"""
+Delivery of the email outbox.
+
+Emails are written to the ``email_outbox`` table in the same transaction as
+the change that triggers them, so they are neither lost when the process
+dies nor sent for a change that was rolled back. ``OutboxDispatcher`` drains
+the table in the background:
+
+- due emails are claimed in batches; each claim counts an attempt and leases
+  the rows, so several workers can dispatch side by side;
+- a batch is split into at most ``concurrency`` parts sent in parallel over
+  the SMTP pool;
+- a failed email is retried after an exponentially growing, jittered delay,
+  and dead-lettered once it has used ``max_attempts``.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+
+from emails.backend.response import SMTPResponse
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.core.mail import SMTPPool, smtp_pool
+from app.db.session import async_session_factory
+from app.models import EmailOutbox
+from app.utils import build_email
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DEPTH = Gauge(
+    "email_outbox_depth",
+    "Emails in the outbox by status (pending or dead).",
+    ["status"],
+    multiprocess_mode="max",
+)
+OUTBOX_ATTEMPTS = Counter(
+    "email_outbox_attempts_total",
+    "Delivery attempts by outcome (sent, retry or dead).",
+    ["outcome"],
+)
+SEND_DURATION = Histogram(
+    "email_send_duration_seconds",
+    "Time to send one batch of outbox emails over an SMTP session.",
+)
+DELIVERY_DELAY = Histogram(
+    "email_outbox_delivery_seconds",
+    "Time from writing an email to the outbox to its delivery.",
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 1800.0, 3600.0, 21600.0),
+)
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        pool: SMTPPool,
+        *,
+        batch_size: int = 100,
+        concurrency: int = 2,
+        poll_interval: float = 5.0,
+        max_attempts: int = 8,
+        backoff: float = 30.0,
+        backoff_max: float = 3600.0,
+        lease: float = 300.0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.pool = pool
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.lease = timedelta(seconds=lease)
+        self._wake = asyncio.Event()
+
+    def wake(self) -> None:
+        """Dispatch now rather than at the next poll, e.g. after a commit."""
+        self._wake.set()
+
+    def retry_delay(self, attempts: int) -> float:
+        """Backoff after the ``attempts``-th failure, with up to 50% jitter."""
+        delay = min(self.backoff * 2 ** (attempts - 1), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def dispatch_once(self) -> int:
+        """Claim and send one batch of due emails; return how many were claimed."""
+        async with self.session_factory() as session:
+            emails = await crud.claim_outbox_emails_async(
+                session, self.batch_size, self.lease
+            )
+        if emails:
+            parts = [emails[i :: self.concurrency] for i in range(self.concurrency)]
+            results = await asyncio.gather(
+                *(self._send(part) for part in parts if part)
+            )
+            async with self.session_factory() as session:
+                await self._record(session, [r for part in results for r in part])
+        await self.update_depth()
+        return len(emails)
+
+    async def _send(
+        self, emails: Sequence[EmailOutbox]
+    ) -> list[tuple[EmailOutbox, str | None]]:
+        """Send ``emails`` over one session; pair each with its error, if any."""
+        messages = [
+            build_email(email.email_to, email.subject, email.html_content)
+            for email in emails
+        ]
+        start = time.perf_counter()
+        try:
+            responses = await asyncio.to_thread(self.pool.send_batch, messages)
+        except Exception as e:
+            logger.exception(f"Sending {len(emails)} outbox emails failed")
+            return [(email, repr(e)) for email in emails]
+        SEND_DURATION.observe(time.perf_counter() - start)
+        return [
+            (email, None if response.success else _describe(response))
+            for email, response in zip(emails, responses, strict=True)
+        ]
+
+    async def _record(
+        self, session: AsyncSession, results: list[tuple[EmailOutbox, str | None]]
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        sent = [email for email, error in results if error is None]
+        if sent:
+            await crud.mark_outbox_sent_async(session, [email.id for email in sent])
+            OUTBOX_ATTEMPTS.labels("sent").inc(len(sent))
+            for email in sent:
+                created_at = email.created_at
+                if created_at.tzinfo is None:  # SQLite drops the offset
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                DELIVERY_DELAY.observe((now - created_at).total_seconds())
+        for email, error in results:
+            if error is None:
+                continue
+            if email.attempts >= self.max_attempts:
+                logger.error(
+                    f"Dead-lettering email {email.id} after {email.attempts} "
+                    f"attempts: {error}"
+                )
+                retry_at = None
+                OUTBOX_ATTEMPTS.labels("dead").inc()
+            else:
+                retry_at = now + timedelta(seconds=self.retry_delay(email.attempts))
+                OUTBOX_ATTEMPTS.labels("retry").inc()
+            await crud.mark_outbox_failed_async(session, email.id, error, retry_at)
+
+    async def update_depth(self) -> None:
+        async with self.session_factory() as session:
+            depth = await crud.get_outbox_depth_async(session)
+        for status, count in depth.items():
+            OUTBOX_DEPTH.labels(status).set(count)
+
+    async def run(self) -> None:
+        """Dispatch until cancelled, polling when the outbox is drained."""
+        while True:
+            try:
+                claimed = await self.dispatch_once()
+            except Exception:
+                logger.exception("Email outbox dispatch failed")
+                claimed = 0
+            if claimed < self.batch_size:
+                self._wake.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+
+
+def _describe(response: SMTPResponse) -> str:
+    if response.error is not None:
+        return repr(response.error)
+    return f"{response.status_code} {response.status_text!r}"
+
+
+outbox_dispatcher = OutboxDispatcher(
+    async_session_factory,
+    smtp_pool,
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    concurrency=settings.EMAIL_OUTBOX_CONCURRENCY,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_SECONDS,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    backoff=settings.EMAIL_OUTBOX_BACKOFF_SECONDS,
+    backoff_max=settings.EMAIL_OUTBOX_BACKOFF_MAX_SECONDS,
+    lease=settings.EMAIL_OUTBOX_LEASE_SECONDS,
+)
@@ -0,0 +1,88 @@
+"""
+Opaque keyset (cursor) pagination.
+
+A cursor encodes the sort key and the id of a row. Pages are selected with a
+row-value comparison on ``(sort key, id)``, so with a composite index on the
+same columns every page is an index range scan, however deep it is.
+"""
+
+import base64
+import json
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, NamedTuple, TypeVar
+
+from sqlalchemy import tuple_
+
+S = TypeVar("S")
+
+
+class Cursor(NamedTuple):
+    sort_key: datetime
+    id: uuid.UUID
+
+
+def encode_cursor(sort_key: datetime, id: uuid.UUID) -> str:
+    raw = json.dumps([sort_key.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        sort_key, id = json.loads(raw)
+        return Cursor(datetime.fromisoformat(sort_key), uuid.UUID(id))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def apply_keyset(
+    statement: S,
+    sort_column: Any,
+    id_column: Any,
+    *,
+    after: Cursor | None = None,
+    before: Cursor | None = None,
+) -> S:
+    """Order ``statement`` by (sort, id) and restrict it to one side of a cursor.
+
+    With ``before`` the rows come back in descending order (nearest first) so
+    that LIMIT keeps the rows adjacent to the cursor; callers reverse them.
+    """
+    key = tuple_(sort_column, id_column)
+    if before is not None:
+        return statement.where(key < tuple_(*before)).order_by(  # type: ignore[attr-defined, no-any-return]
+            sort_column.desc(), id_column.desc()
+        )
+    if after is not None:
+        statement = statement.where(key > tuple_(*after))  # type: ignore[attr-defined]
+    return statement.order_by(sort_column, id_column)  # type: ignore[attr-defined, no-any-return]
+
+
+def page_cursors(
+    rows: Sequence[Any],
+    limit: int,
+    *,
+    after: Cursor | None = None,
+    before: Cursor | None = None,
+    skip: int = 0,
+    sort_attr: str = "created_at",
+) -> dict[str, str | None]:
+    """Return the next/previous cursors for a page of ``rows``.
+
+    A full page is assumed to have more rows beyond it.
+    """
+    if not rows:
+        return {"next_cursor": None, "previous_cursor": None}
+    first = encode_cursor(getattr(rows[0], sort_attr), rows[0].id)
+    last = encode_cursor(getattr(rows[-1], sort_attr), rows[-1].id)
+    if before is not None:
+        return {
+            "next_cursor": last,
+            "previous_cursor": first if len(rows) == limit else None,
+        }
+    return {
+        "next_cursor": last if len(rows) == limit else None,
+        "previous_cursor": first if after is not None or skip else None,
+    }
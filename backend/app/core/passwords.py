@@ -0,0 +1,122 @@
+"""
+Password hashing off the event loop and request threads.
+
+bcrypt is CPU bound, so hashes are computed in a dedicated process pool whose
+size bounds the CPU spent on them. Jobs beyond the workers wait in a short
+queue; when that is full, callers get ``PasswordServiceBusy`` straight away
+instead of piling up behind a login storm.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, TypeVar
+
+from app.core import hashing
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordServiceBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordService:
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_pending: int = 0,
+        rounds: int | None = None,
+        target_ms: float = 250.0,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.target_ms = target_ms
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        """Set the bcrypt cost and create the process pool.
+
+        Without a fixed cost, it is calibrated against ``target_ms`` on this
+        machine. Workers are spawned as jobs arrive.
+        """
+        with self._lock:
+            if self._executor is not None:
+                return
+            if self.rounds is None:
+                self.rounds = hashing.calibrate_rounds(self.target_ms)
+                logger.info(
+                    "Calibrated bcrypt cost to %d for %.0f ms per hash",
+                    self.rounds,
+                    self.target_ms,
+                )
+            hashing.configure(self.rounds)
+            # Forking a process with running threads is unsafe; spawned
+            # workers only import app.core.hashing.
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=hashing.configure,
+                initargs=(self.rounds,),
+            )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            # Calibrating blocks for a few hashes; keep it off the event loop
+            await asyncio.to_thread(self.start)
+        with self._lock:
+            if self._executor is None:
+                raise RuntimeError("Password service has been shut down")
+            if self._in_flight >= self.workers + self.max_pending:
+                self.rejected += 1
+                raise PasswordServiceBusy("Password hashing queue is full")
+            self._in_flight += 1
+            future = self._executor.submit(fn, *args)
+        # Counted until the worker is done, even if the caller goes away
+        future.add_done_callback(self._job_done)
+        return await asyncio.wrap_future(future)
+
+    def _job_done(self, _future: Future[Any]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hashing.get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(hashing.verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "rounds": self.rounds,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "rejected": self.rejected,
+            }
+
+
+password_service = PasswordService(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    rounds=settings.PASSWORD_HASH_ROUNDS,
+    target_ms=settings.PASSWORD_HASH_TARGET_MS,
+)
@@ -1,31 +1,42 @@
-import logging
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import jwt
-from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Try to create a CryptContext with bcrypt, but fall back to a simpler scheme
-# if there's an issue
-try:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    # Test that it works
-    test_hash = pwd_context.hash("test")
-    logger.info("Successfully initialized bcrypt password hashing")
-except Exception as e:
-    logger.warning(f"Error initializing bcrypt: {e}. Falling back to sha256_crypt")
-    # Fall back to sha256_crypt which has fewer dependencies
-    pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
-
+from app.core.hashing import (
+    get_password_hash,
+    needs_update,
+    pwd_context,
+    scheme_and_cost,
+    verify_password,
+)
+
+# The hashing helpers are re-exported for existing callers
+__all__ = [
+    "ALGORITHM",
+    "create_access_token",
+    "decode_access_token",
+    "get_password_hash",
+    "needs_update",
+    "pwd_context",
+    "scheme_and_cost",
+    "token_cache",
+    "verify_password",
+]
 
 ALGORITHM = "HS256"
 
+# Claims of verified access tokens keyed by the token's digest, so that the
+# signature is checked once per token and worker instead of on every request
+token_cache: TTLCache[bytes, dict[str, Any]] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
 
 def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
@@ -34,9 +45,16 @@ def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     return encoded_jwt
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
+def decode_access_token(token: str) -> dict[str, Any]:
+    """Verify ``token`` and return its claims.
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    Raises ``jwt.InvalidTokenError`` if the token is invalid or has expired.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    exp = payload.get("exp")
+    token_cache.set(digest, payload, ttl=None if exp is None else exp - time.time())
+    return payload
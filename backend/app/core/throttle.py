@@ -0,0 +1,169 @@
+"""
+Sliding-window throttling of login attempts.
+
+Login attempts are counted per email and per client IP as soon as they
+arrive, before any database or password work, so a concurrent burst is cut
+off at the limit rather than after its failures have been recorded. Once
+either key has reached its limit within the window, further attempts are
+rejected until enough of the counted ones have left the window. Rejected
+attempts are not counted, and a successful login clears its email's count
+and takes its own attempt off the IP's.
+
+The in-process store only sees the attempts made on its own worker. To share
+the counts between workers, set LOGIN_THROTTLE_REDIS_URL (requires the
+``redis`` extra).
+"""
+
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Protocol
+
+from app.core.config import settings
+
+
+class ThrottleStore(Protocol):
+    async def hits(self, key: str, since: float) -> list[float]:
+        """Return the timestamps recorded for ``key`` after ``since``, oldest first."""
+        ...
+
+    async def add(self, key: str, timestamp: float, window: float) -> None: ...
+
+    async def discard(self, key: str, timestamp: float) -> None:
+        """Remove one entry recorded at ``timestamp``, if any."""
+        ...
+
+    async def clear(self, key: str) -> None: ...
+
+
+class MemoryThrottleStore:
+    """Per-process store; the least recently used keys are dropped first."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, deque[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hits(self, key: str, since: float) -> list[float]:
+        with self._lock:
+            timestamps = self._data.get(key)
+            if timestamps is None:
+                return []
+            while timestamps and timestamps[0] <= since:
+                timestamps.popleft()
+            if not timestamps:
+                del self._data[key]
+            return list(timestamps)
+
+    async def add(self, key: str, timestamp: float, window: float) -> None:
+        with self._lock:
+            self._data.setdefault(key, deque()).append(timestamp)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    async def discard(self, key: str, timestamp: float) -> None:
+        with self._lock:
+            timestamps = self._data.get(key)
+            if timestamps is not None and timestamp in timestamps:
+                timestamps.remove(timestamp)
+
+    async def clear(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class RedisThrottleStore:
+    """Store shared by all workers, as one sorted set of timestamps per key."""
+
+    def __init__(self, url: str) -> None:
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+
+    async def hits(self, key: str, since: float) -> list[float]:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(key, "-inf", since)
+            pipe.zrange(key, 0, -1, withscores=True)
+            _, entries = await pipe.execute()
+        return [score for _, score in entries]
+
+    async def add(self, key: str, timestamp: float, window: float) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(key, {f"{timestamp}:{uuid.uuid4().hex}": timestamp})
+            pipe.expire(key, math.ceil(window))
+            await pipe.execute()
+
+    async def discard(self, key: str, timestamp: float) -> None:
+        # Only one member: concurrent attempts may share the timestamp
+        members = await self._redis.zrangebyscore(
+            key, timestamp, timestamp, start=0, num=1
+        )
+        if members:
+            await self._redis.zrem(key, *members)
+
+    async def clear(self, key: str) -> None:
+        await self._redis.delete(key)
+
+
+class LoginThrottle:
+    def __init__(
+        self,
+        store: ThrottleStore,
+        *,
+        window: float,
+        max_per_email: int,
+        max_per_ip: int,
+    ) -> None:
+        self.store = store
+        self.window = window
+        self.max_per_email = max_per_email
+        self.max_per_ip = max_per_ip
+
+    def _limits(self, email: str, client_ip: str) -> list[tuple[str, int]]:
+        return [
+            (f"login:email:{email.lower()}", self.max_per_email),
+            (f"login:ip:{client_ip}", self.max_per_ip),
+        ]
+
+    async def attempt(self, email: str, client_ip: str) -> tuple[float, float | None]:
+        """Count a login attempt before any credential work.
+
+        Return when it was counted and, if it is over a limit, how many
+        seconds to wait before trying again; a rejected attempt is not
+        counted.
+        """
+        now = time.time()
+        limits = self._limits(email, client_ip)
+        wait: float | None = None
+        for key, limit in limits:
+            # Adding before counting keeps concurrent attempts from all
+            # seeing the same count below the limit
+            await self.store.add(key, now, self.window)
+            hits = await self.store.hits(key, now - self.window)
+            if len(hits) > limit:
+                # Allowed again once all but limit - 1 of the others expired
+                until = hits[len(hits) - 1 - limit] + self.window - now
+                wait = until if wait is None else max(wait, until)
+        if wait is not None:
+            for key, _ in limits:
+                await self.store.discard(key, now)
+        return now, wait
+
+    async def record_success(
+        self, email: str, client_ip: str, attempted_at: float
+    ) -> None:
+        await self.store.clear(f"login:email:{email.lower()}")
+        await self.store.discard(f"login:ip:{client_ip}", attempted_at)
+
+
+login_throttle = LoginThrottle(
+    RedisThrottleStore(settings.LOGIN_THROTTLE_REDIS_URL)
+    if settings.LOGIN_THROTTLE_REDIS_URL
+    else MemoryThrottleStore(maxsize=settings.LOGIN_THROTTLE_MAXKEYS),
+    window=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+    max_per_email=settings.LOGIN_THROTTLE_MAX_PER_EMAIL,
+    max_per_ip=settings.LOGIN_THROTTLE_MAX_PER_IP,
+)
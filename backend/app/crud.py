@@ -1,37 +1,119 @@
 import uuid
-from typing import Any
+from collections import Counter
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, NamedTuple
 
-from sqlalchemy import func
-from sqlmodel import Session, select
+from sqlalchemy import func, insert, text, update
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, ItemUpdate, User, UserCreate, UserUpdate
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pagination import Cursor, apply_keyset
+from app.core.passwords import password_service
+from app.core.security import (
+    get_password_hash,
+    needs_update,
+    scheme_and_cost,
+    verify_password,
+)
+from app.models import (
+    OUTBOX_DEAD,
+    OUTBOX_PENDING,
+    OUTBOX_SENT,
+    EmailOutbox,
+    Item,
+    ItemCreate,
+    ItemUpdate,
+    User,
+    UserCreate,
+    UserUpdate,
+)
+
+
+class Total(NamedTuple):
+    count: int
+    estimated: bool = False
+
+
+class Page(NamedTuple):
+    rows: list[Any]
+    total: Total
+
+
+# Listing totals per scope: ("users",), ("items", None) or ("items", owner_id)
+totals_cache: TTLCache[tuple[Any, ...], Total] = TTLCache(
+    maxsize=settings.COUNT_CACHE_MAXSIZE, ttl=settings.COUNT_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_user_totals() -> None:
+    totals_cache.pop(("users",))
+
+
+def invalidate_item_totals(owner_id: uuid.UUID | None = None) -> None:
+    totals_cache.pop(("items", None))
+    if owner_id is not None:
+        totals_cache.pop(("items", owner_id))
+
+
+# Column values of authenticated users keyed by token subject (email)
+principal_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(*emails: str) -> None:
+    for email in emails:
+        principal_cache.pop(email)
 
 
 def get_user(session: Session, user_id: uuid.UUID) -> User | None:
     return session.get(User, user_id)
 
 
+def _email_matches(email: str) -> Any:
+    # Matches the expression of the unique uq_user_email_lower index
+    return func.lower(User.email) == email.lower()
+
+
 def get_user_by_email(session: Session, email: str) -> User | None:
-    return session.exec(select(User).where(User.email == email)).first()
+    return session.exec(select(User).where(_email_matches(email))).first()
 
 
 def get_users(session: Session, skip: int = 0, limit: int = 100) -> list[User]:
-    statement = select(User).offset(skip).limit(limit)
-    return session.exec(statement).all()
+    statement = apply_keyset(select(User), User.created_at, User.id)
+    return session.exec(statement.offset(skip).limit(limit)).all()
 
 
-def create_user(session: Session, user_create: UserCreate) -> User:
-    db_user = User(
+def _build_user(user_create: UserCreate, hashed_password: str) -> User:
+    return User(
         email=user_create.email,
-        hashed_password=get_password_hash(user_create.password),
+        hashed_password=hashed_password,
         is_active=True,
         is_superuser=user_create.is_superuser,
         full_name=user_create.full_name,
     )
+
+
+def _user_update_data(user_in: UserUpdate | dict[str, Any]) -> dict[str, Any]:
+    if isinstance(user_in, dict):
+        return dict(user_in)
+    # Handle both Pydantic v1 and v2
+    if hasattr(user_in, "model_dump"):
+        return user_in.model_dump(exclude_unset=True)
+    return user_in.dict(exclude_unset=True)
+
+
+def create_user(session: Session, user_create: UserCreate) -> User:
+    db_user = _build_user(user_create, get_password_hash(user_create.password))
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
+    invalidate_user_totals()
     return db_user
 
 
@@ -46,25 +128,19 @@ def update_user(
     if db_user is None:
         return None
 
-    if isinstance(user_in, dict):
-        update_data = user_in
-    else:
-        # Handle both Pydantic v1 and v2
-        if hasattr(user_in, "model_dump"):
-            update_data = user_in.model_dump(exclude_unset=True)
-        else:
-            update_data = user_in.dict(exclude_unset=True)
-
+    update_data = _user_update_data(user_in)
     if "password" in update_data and update_data["password"]:
         update_data["hashed_password"] = get_password_hash(update_data["password"])
         del update_data["password"]
 
+    previous_email = db_user.email
     for field, value in update_data.items():
         setattr(db_user, field, value)
 
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
+    invalidate_principal(previous_email, db_user.email)
     return db_user
 
 
@@ -74,6 +150,9 @@ def delete_user(session: Session, user_id: uuid.UUID) -> User | None:
         return None
     session.delete(db_user)
     session.commit()
+    invalidate_principal(db_user.email)
+    invalidate_user_totals()
+    invalidate_item_totals(user_id)
     return db_user
 
 
@@ -83,15 +162,20 @@ def authenticate_user(session: Session, email: str, password: str) -> User | Non
         return None
     if not verify_password(password, user.hashed_password):
         return None
+    if needs_update(user.hashed_password):
+        user.hashed_password = get_password_hash(password)
+        session.add(user)
+        session.commit()
+        invalidate_principal(user.email)
     return user
 
 
 def get_active_users(session: Session) -> list[User]:
-    return session.exec(select(User).where(User.is_active.is_(True))).all()
+    return session.exec(select(User).where(User.is_active)).all()
 
 
 def get_superusers(session: Session) -> list[User]:
-    return session.exec(select(User).where(User.is_superuser.is_(True))).all()
+    return session.exec(select(User).where(User.is_superuser)).all()
 
 
 def count_users(session: Session) -> int:
@@ -107,6 +191,7 @@ def create_item(session: Session, item_create: ItemCreate, owner_id: int) -> Ite
     session.add(db_item)
     session.commit()
     session.refresh(db_item)
+    invalidate_item_totals(owner_id)
     return db_item
 
 
@@ -115,7 +200,8 @@ def get_item(session: Session, item_id: int) -> Item | None:
 
 
 def get_items(session: Session, skip: int = 0, limit: int = 100) -> list[Item]:
-    return session.query(Item).offset(skip).limit(limit).all()
+    statement = apply_keyset(select(Item), Item.created_at, Item.id)
+    return session.exec(statement.offset(skip).limit(limit)).all()
 
 
 def update_item(session: Session, item: Item, item_update: ItemUpdate) -> Item:
@@ -130,3 +216,465 @@ def update_item(session: Session, item: Item, item_update: ItemUpdate) -> Item:
 def delete_item(session: Session, item: Item) -> None:
     session.delete(item)
     session.commit()
+    invalidate_item_totals(item.owner_id)
+
+
+# Async variants used by the request path. They mirror the sync functions
+# above, which remain in use by init_db, Alembic and the CLI scripts. Password
+# hashing is CPU bound, so it is moved off the event loop.
+
+
+async def get_user_async(session: AsyncSession, user_id: uuid.UUID) -> User | None:
+    return await session.get(User, user_id)
+
+
+async def get_user_by_email_async(session: AsyncSession, email: str) -> User | None:
+    result = await session.exec(select(User).where(_email_matches(email)))
+    return result.first()
+
+
+async def get_principal_async(session: AsyncSession, email: str) -> User | None:
+    """Return the user a token subject refers to, from the principal cache.
+
+    A hit costs no query. Updates and deletes made through this worker
+    invalidate its entry; those made on other workers, including deactivation
+    and password changes, are seen once the entry expires, so at most
+    ``PRINCIPAL_CACHE_TTL_SECONDS`` late.
+
+    A cached user is attached to ``session`` as if it had just been loaded, so
+    callers can modify and commit it as usual.
+    """
+    data = principal_cache.get(email)
+    if data is None:
+        user = await get_user_by_email_async(session, email)
+        if user is not None:
+            principal_cache.set(email, user.model_dump())
+        return user
+    user = User(**data)
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+
+async def get_users_async(
+    session: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after: Cursor | None = None,
+    before: Cursor | None = None,
+) -> list[User]:
+    statement = apply_keyset(
+        select(User), User.created_at, User.id, after=after, before=before
+    )
+    result = await session.exec(statement.offset(skip).limit(limit))
+    users = list(result.all())
+    return users[::-1] if before is not None else users
+
+
+async def create_user_async(
+    session: AsyncSession,
+    user_create: UserCreate,
+    emails: Sequence[EmailOutbox] = (),
+) -> User:
+    """Create a user, committing ``emails`` to the outbox in the same transaction."""
+    hashed_password = await password_service.hash(user_create.password)
+    db_user = _build_user(user_create, hashed_password)
+    session.add(db_user)
+    session.add_all(emails)
+    await session.commit()
+    await session.refresh(db_user)
+    invalidate_user_totals()
+    return db_user
+
+
+async def update_user_async(
+    session: AsyncSession,
+    user_in: UserUpdate | dict[str, Any],
+    db_user: User | None = None,
+    user_id: uuid.UUID | None = None,
+) -> User | None:
+    if db_user is None and user_id is not None:
+        db_user = await get_user_async(session, user_id)
+    if db_user is None:
+        return None
+
+    update_data = _user_update_data(user_in)
+    if "password" in update_data and update_data["password"]:
+        update_data["hashed_password"] = await password_service.hash(
+            update_data["password"]
+        )
+        del update_data["password"]
+
+    previous_email = db_user.email
+    for field, value in update_data.items():
+        setattr(db_user, field, value)
+
+    session.add(db_user)
+    await session.commit()
+    await session.refresh(db_user)
+    invalidate_principal(previous_email, db_user.email)
+    return db_user
+
+
+async def delete_user_async(session: AsyncSession, user_id: uuid.UUID) -> User | None:
+    db_user = await get_user_async(session, user_id)
+    if db_user is None:
+        return None
+    await session.delete(db_user)
+    await session.commit()
+    invalidate_principal(db_user.email)
+    invalidate_user_totals()
+    invalidate_item_totals(user_id)
+    return db_user
+
+
+async def authenticate_user_async(
+    session: AsyncSession, email: str, password: str
+) -> User | None:
+    user = await get_user_by_email_async(session, email)
+    if not user:
+        return None
+    if not await password_service.verify(password, user.hashed_password):
+        return None
+    if needs_update(user.hashed_password):
+        # Move the stored hash to the current scheme and cost while the
+        # plain password is at hand
+        user.hashed_password = await password_service.hash(password)
+        session.add(user)
+        await session.commit()
+        invalidate_principal(user.email)
+    return user
+
+
+async def get_password_hash_stats_async(session: AsyncSession) -> list[dict[str, Any]]:
+    """Count stored password hashes by scheme and cost."""
+    prefix = func.substr(User.hashed_password, 1, 7)
+    result = await session.exec(select(prefix, func.count()).group_by(prefix))
+    counts: Counter[tuple[str, int | None]] = Counter()
+    for hash_prefix, count in result.all():
+        counts[scheme_and_cost(hash_prefix)] += count
+    return [
+        {"scheme": scheme, "cost": cost, "count": count}
+        for (scheme, cost), count in sorted(
+            counts.items(), key=lambda kv: (kv[0][0], kv[0][1] or 0)
+        )
+    ]
+
+
+async def _estimate_rows(session: AsyncSession, table: str) -> int | None:
+    """Return the planner's row estimate for ``table``, on PostgreSQL only."""
+    connection = await session.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+    result = await session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)"),
+        {"t": f'"{table}"'},
+    )
+    estimate = result.scalar()
+    # reltuples is -1 for tables that were never vacuumed or analyzed
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+async def _estimated_total_async(session: AsyncSession, model: Any) -> Total | None:
+    if settings.COUNT_ESTIMATE_MIN_ROWS is None:
+        return None
+    estimate = await _estimate_rows(session, model.__tablename__)
+    if estimate is not None and estimate >= settings.COUNT_ESTIMATE_MIN_ROWS:
+        return Total(estimate, estimated=True)
+    return None
+
+
+async def _get_page_async(
+    session: AsyncSession,
+    key: tuple[Any, ...],
+    model: Any,
+    *where: Any,
+    skip: int,
+    limit: int,
+    after: Cursor | None,
+    before: Cursor | None,
+) -> Page:
+    """Fetch a page of ``model`` rows and the listing total.
+
+    When the total is not cached it rides along with the page as an
+    uncorrelated scalar subquery, so either way the listing costs a single
+    round trip. Unlike count(*) OVER () this counts the whole scope, not just
+    the rows past a keyset cursor.
+    """
+    total = totals_cache.get(key)
+    if total is None and not where:
+        total = await _estimated_total_async(session, model)
+        if total is not None:
+            totals_cache.set(key, total)
+    count_statement = select(func.count()).select_from(model).where(*where)
+
+    if total is not None:
+        statement = select(model)
+    else:
+        statement = select(model, count_statement.scalar_subquery())
+    statement = apply_keyset(
+        statement.where(*where), model.created_at, model.id, after=after, before=before
+    )
+    rows = list((await session.exec(statement.offset(skip).limit(limit))).all())
+
+    if total is None:
+        if rows:
+            total = Total(rows[0][1])
+            rows = [row[0] for row in rows]
+        else:
+            # Past the last page there is no row to carry the total
+            total = Total((await session.exec(count_statement)).one())
+        totals_cache.set(key, total)
+    if before is not None:
+        rows.reverse()
+    return Page(rows, total)
+
+
+async def get_users_page_async(
+    session: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after: Cursor | None = None,
+    before: Cursor | None = None,
+) -> Page:
+    """A page of users with the listing total, in one round trip."""
+    return await _get_page_async(
+        session,
+        ("users",),
+        User,
+        skip=skip,
+        limit=limit,
+        after=after,
+        before=before,
+    )
+
+
+async def get_items_page_async(
+    session: AsyncSession,
+    owner_id: uuid.UUID | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    after: Cursor | None = None,
+    before: Cursor | None = None,
+) -> Page:
+    """A page of items, overall or for one owner, with the listing total."""
+    where = [] if owner_id is None else [Item.owner_id == owner_id]
+    return await _get_page_async(
+        session,
+        ("items", owner_id),
+        Item,
+        *where,
+        skip=skip,
+        limit=limit,
+        after=after,
+        before=before,
+    )
+
+
+async def get_active_users_async(session: AsyncSession) -> list[User]:
+    result = await session.exec(select(User).where(User.is_active))
+    return list(result.all())
+
+
+async def get_superusers_async(session: AsyncSession) -> list[User]:
+    result = await session.exec(select(User).where(User.is_superuser))
+    return list(result.all())
+
+
+async def count_users_async(session: AsyncSession) -> int:
+    result = await session.exec(select(func.count()).select_from(User))
+    return result.one()
+
+
+async def create_item_async(
+    session: AsyncSession, item_create: ItemCreate, owner_id: uuid.UUID
+) -> Item:
+    db_item = Item.model_validate(item_create, update={"owner_id": owner_id})
+    session.add(db_item)
+    await session.commit()
+    await session.refresh(db_item)
+    invalidate_item_totals(owner_id)
+    return db_item
+
+
+async def create_items_bulk_async(
+    session: AsyncSession, items: Sequence[ItemCreate], owner_id: uuid.UUID
+) -> list[uuid.UUID]:
+    """Insert ``items`` for ``owner_id`` and return their ids, in input order.
+
+    Rows go in multi-row INSERT ... RETURNING statements; on PostgreSQL large
+    batches are streamed with COPY instead.
+    """
+    if not items:
+        return []
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "owner_id": owner_id,
+            # Keep the input order when listing by (created_at, id)
+            "created_at": now + timedelta(microseconds=i),
+            "updated_at": now,
+            **item.model_dump(),
+        }
+        for i, item in enumerate(items)
+    ]
+    connection = await session.connection()
+    if (
+        connection.dialect.name == "postgresql"
+        and len(rows) >= settings.ITEMS_BULK_COPY_MIN_ROWS
+    ):
+        columns = list(rows[0])
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        assert driver_connection is not None
+        async with driver_connection.cursor() as cursor:
+            async with cursor.copy(
+                f"COPY item ({', '.join(columns)}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    await copy.write_row([row[column] for column in columns])
+        ids = [row["id"] for row in rows]
+    else:
+        # Executed as multi-row INSERTs of up to 1000 rows each
+        result = await session.execute(
+            insert(Item).returning(col(Item.id), sort_by_parameter_order=True), rows
+        )
+        ids = list(result.scalars().all())
+    await session.commit()
+    invalidate_item_totals(owner_id)
+    return ids
+
+
+async def get_item_async(session: AsyncSession, item_id: uuid.UUID) -> Item | None:
+    return await session.get(Item, item_id)
+
+
+async def get_item_version_async(
+    session: AsyncSession, item_id: uuid.UUID
+) -> tuple[uuid.UUID, Any] | None:
+    """Owner and ``updated_at`` of an item, without loading the row."""
+    statement = select(Item.owner_id, Item.updated_at).where(Item.id == item_id)
+    return (await session.exec(statement)).first()
+
+
+async def get_items_async(
+    session: AsyncSession,
+    owner_id: uuid.UUID | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    after: Cursor | None = None,
+    before: Cursor | None = None,
+) -> list[Item]:
+    statement = select(Item)
+    if owner_id is not None:
+        statement = statement.where(Item.owner_id == owner_id)
+    statement = apply_keyset(
+        statement, Item.created_at, Item.id, after=after, before=before
+    )
+    result = await session.exec(statement.offset(skip).limit(limit))
+    items = list(result.all())
+    return items[::-1] if before is not None else items
+
+
+async def update_item_async(
+    session: AsyncSession, item: Item, item_update: ItemUpdate
+) -> Item:
+    item.sqlmodel_update(item_update.model_dump(exclude_unset=True))
+    session.add(item)
+    await session.commit()
+    await session.refresh(item)
+    return item
+
+
+async def delete_item_async(session: AsyncSession, item: Item) -> None:
+    await session.delete(item)
+    await session.commit()
+    invalidate_item_totals(item.owner_id)
+
+
+def outbox_email(email_to: str, subject: str, html_content: str) -> EmailOutbox:
+    """Build an outbox row; add it to the session of the triggering change."""
+    return EmailOutbox(email_to=email_to, subject=subject, html_content=html_content)
+
+
+async def claim_outbox_emails_async(
+    session: AsyncSession, limit: int, lease: timedelta
+) -> list[EmailOutbox]:
+    """Take up to ``limit`` due emails and count an attempt for each.
+
+    Claimed rows are not due again until ``lease`` has passed, so concurrent
+    dispatchers skip them, and a dispatcher that dies mid-send only delays
+    them. On PostgreSQL, rows locked by another claim are skipped.
+    """
+    now = datetime.now(timezone.utc)
+    due = (
+        select(EmailOutbox.id)
+        .where(EmailOutbox.status == OUTBOX_PENDING)
+        .where(EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    statement = (
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(due.scalar_subquery()))
+        .values(attempts=EmailOutbox.attempts + 1, next_attempt_at=now + lease)
+        .returning(EmailOutbox)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.exec(statement)  # type: ignore[call-overload]
+    emails = list(result.scalars())
+    await session.commit()
+    return emails
+
+
+async def mark_outbox_sent_async(
+    session: AsyncSession, email_ids: Sequence[uuid.UUID]
+) -> None:
+    """Mark emails sent and drop their bodies, which may hold reset tokens."""
+    await session.exec(  # type: ignore[call-overload]
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(email_ids))
+        .values(
+            status=OUTBOX_SENT,
+            sent_at=datetime.now(timezone.utc),
+            last_error=None,
+            html_content="",
+        )
+    )
+    await session.commit()
+
+
+async def mark_outbox_failed_async(
+    session: AsyncSession,
+    email_id: uuid.UUID,
+    error: str,
+    retry_at: datetime | None,
+) -> None:
+    """Record a failed attempt; without ``retry_at`` the email is dead-lettered.
+
+    Like sent emails, dead letters keep their recipient, subject and error
+    but not their body.
+    """
+    values: dict[str, Any] = {"last_error": error}
+    if retry_at is None:
+        values["status"] = OUTBOX_DEAD
+        values["html_content"] = ""
+    else:
+        values["next_attempt_at"] = retry_at
+    await session.exec(  # type: ignore[call-overload]
+        update(EmailOutbox).where(EmailOutbox.id == email_id).values(**values)
+    )
+    await session.commit()
+
+
+async def get_outbox_depth_async(session: AsyncSession) -> dict[str, int]:
+    """Number of pending and dead-lettered emails."""
+    statement = (
+        select(EmailOutbox.status, func.count())
+        .where(EmailOutbox.status != OUTBOX_SENT)
+        .group_by(EmailOutbox.status)
+    )
+    counts = dict((await session.exec(statement)).all())
+    return {status: counts.get(status, 0) for status in (OUTBOX_PENDING, OUTBOX_DEAD)}
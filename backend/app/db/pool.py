@@ -0,0 +1,117 @@
+"""
+Connection pool instrumentation.
+
+The pool classes below behave exactly like SQLAlchemy's queue pools but record
+how long each checkout waited and how many checkouts timed out. Together with
+the pool events registered by ``instrument_pool`` this gives enough data to
+size ``DB_POOL_SIZE`` and ``DB_MAX_OVERFLOW`` from production traffic.
+"""
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolStats:
+    """Thread-safe counters for a single connection pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_time_total_s": round(self.wait_time_total, 6),
+                "wait_time_avg_ms": round(self.wait_time_total / waits * 1000, 3)
+                if waits
+                else 0.0,
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            }
+
+
+class _InstrumentedPoolMixin:
+    stats: PoolStats
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()  # type: ignore[misc]
+        except sa_exc.TimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+    def recreate(self) -> Any:
+        # Keep counting into the same stats across engine.dispose()
+        new_pool = super().recreate()  # type: ignore[misc]
+        new_pool.stats = self.stats
+        return new_pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+
+def instrument_pool(pool: Pool) -> None:
+    """Count connects, checkouts, checkins and invalidations on ``pool``."""
+    stats: PoolStats = pool.stats  # type: ignore[attr-defined]
+
+    event.listen(pool, "connect", lambda *_: stats.incr("connects"))
+    event.listen(pool, "checkout", lambda *_: stats.incr("checkouts"))
+    event.listen(pool, "checkin", lambda *_: stats.incr("checkins"))
+    event.listen(pool, "invalidate", lambda *_: stats.incr("invalidations"))
+
+
+def pool_status(pool: Pool) -> dict[str, Any]:
+    """Return the live gauges and the cumulative counters of ``pool``."""
+    status: dict[str, Any] = {}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout_s=pool.timeout(),
+        )
+    stats = getattr(pool, "stats", None)
+    if isinstance(stats, PoolStats):
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,149 @@
+"""
+Read replica selection.
+
+``ReplicaSet`` keeps the health of each replica engine up to date and hands
+out healthy replicas round-robin. A replica is ejected when its health probe
+fails, times out or reports more replication lag than allowed, and when a
+request hits a disconnect on it; the next successful probe puts it back.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last replayed transaction, or 0 when the replica has
+# replayed everything it received (an idle primary is not lag).
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE COALESCE("
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.healthy = True
+        self.lag: float | None = None
+        self.last_checked: float | None = None
+        self.last_error: str | None = None
+
+    @property
+    def name(self) -> str:
+        url = self.engine.url
+        return f"{url.host}:{url.port or 5432}/{url.database}"
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_s": self.lag,
+            "last_checked": self.last_checked,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaSet:
+    """Health-aware round-robin over read replica engines."""
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        max_lag: float,
+        check_interval: float,
+        check_timeout: float,
+        read_your_writes_window: float,
+    ) -> None:
+        self.replicas = [Replica(engine) for engine in engines]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.read_your_writes_window = read_your_writes_window
+        self._counter = itertools.count()
+        self._recent_writes: dict[str, float] = {}
+        self._lock = threading.Lock()
+        for replica in self.replicas:
+            event.listen(
+                replica.engine.sync_engine,
+                "handle_error",
+                self._make_error_handler(replica),
+            )
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def _make_error_handler(self, replica: Replica) -> Any:
+        def on_error(context: ExceptionContext) -> None:
+            if context.is_disconnect:
+                self.eject(replica, str(context.original_exception))
+
+        return on_error
+
+    def eject(self, replica: Replica, reason: str) -> None:
+        if replica.healthy:
+            logger.warning(f"Ejecting read replica {replica.name}: {reason}")
+        replica.healthy = False
+        replica.last_error = reason
+
+    def choose(self) -> AsyncEngine | None:
+        """Return the next healthy replica engine, or None to use the primary."""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)].engine
+
+    def record_write(self, client_key: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._recent_writes[client_key] = now
+            # Drop expired entries so the map stays bounded by active writers
+            expired = now - self.read_your_writes_window
+            if len(self._recent_writes) > 10_000:
+                self._recent_writes = {
+                    key: ts for key, ts in self._recent_writes.items() if ts > expired
+                }
+
+    def wrote_recently(self, client_key: str) -> bool:
+        with self._lock:
+            ts = self._recent_writes.get(client_key)
+        return ts is not None and time.monotonic() - ts < self.read_your_writes_window
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            async with asyncio.timeout(self.check_timeout):
+                async with replica.engine.connect() as conn:
+                    lag = float((await conn.execute(LAG_QUERY)).scalar() or 0)
+        except Exception as e:
+            self.eject(replica, f"health check failed: {e!r}")
+            return
+        finally:
+            replica.last_checked = time.time()
+        replica.lag = lag
+        if lag > self.max_lag:
+            self.eject(replica, f"replication lag {lag:.1f}s > {self.max_lag}s")
+            return
+        if not replica.healthy:
+            logger.info(f"Read replica {replica.name} is healthy again")
+        replica.healthy = True
+        replica.last_error = None
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def monitor(self) -> None:
+        """Probe every replica each ``check_interval`` seconds, forever."""
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.check_interval)
+
+    def status(self) -> list[dict[str, Any]]:
+        return [replica.status() for replica in self.replicas]
@@ -1,10 +1,77 @@
-from collections.abc import Generator
+import hashlib
+from collections.abc import AsyncGenerator, Generator
+from typing import Any
 
+from fastapi import Request
+from sqlalchemy import Delete, Insert, Update
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.db import engine
+from app.core.db import async_engine, engine, replica_set
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class RoutingSession(Session):
+    """Route the reads of a read-only session to a replica.
+
+    The replica is chosen on the first read and kept for the session. Writes
+    (flushes, DML and SELECT ... FOR UPDATE) always go to the primary,
+    and once a session has written, every later statement in it follows so
+    the request reads its own writes.
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Engine:
+        if (
+            self._flushing
+            or isinstance(clause, Insert | Update | Delete)
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            self.info["wrote"] = True
+        if self.info.get("read_only") and not self.info.get("wrote"):
+            # Chosen once, so all reads of a session see the same replica
+            # state and use a single pooled connection
+            if "replica" not in self.info:
+                self.info["replica"] = replica_set.choose()
+            replica = self.info["replica"]
+            if replica is not None:
+                return replica.sync_engine
+        return async_engine.sync_engine
+
+
+# Objects stay usable after commit so responses can be serialized without
+# triggering an implicit (and, under asyncio, forbidden) lazy refresh.
+async_session_factory = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+)
+
+
+def client_key(request: Request) -> str:
+    """Identify the caller for read-your-writes tracking."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).hexdigest()
+    return request.client.host if request.client else "unknown"
 
 
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    key = client_key(request)
+    read_only = (
+        bool(replica_set)
+        and request.method in SAFE_METHODS
+        and not replica_set.wrote_recently(key)
+    )
+    async with async_session_factory(info={"read_only": read_only}) as session:
+        yield session
+        if replica_set and session.info.get("wrote"):
+            replica_set.record_write(key)
@@ -1,61 +1,59 @@
+import asyncio
 import os
 import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 import sentry_sdk
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.routing import APIRoute
 
 from app.api.main import api_router
 from app.core.config import settings
+from app.core.db import replica_set
+from app.core.email_templates import email_templates
+from app.core.health import dependency_registry, system_sampler
+from app.core.log import RequestLoggingMiddleware, log_writer
+from app.core.mail import mailer
+from app.core.metrics import MetricsMiddleware, mark_process_dead, render_metrics
+from app.core.outbox import outbox_dispatcher
+from app.core.passwords import PasswordServiceBusy, password_service
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
-class RequestLoggingMiddleware:
-    """Middleware for logging request details. Updated for CI/CD workflow testing."""
-
-    async def __call__(self, request: Request, call_next):
-        # Record request start time
-        start_time = time.time()
-
-        # Get request details
-        method = request.method
-        url = request.url.path
-        query_params = str(request.query_params)
-        client_host = request.client.host if request.client else "unknown"
-
-        # Process the request
-        response = await call_next(request)
-
-        # Calculate processing time
-        process_time = time.time() - start_time
-
-        # Log request details
-        log_msg = (
-            f"Request: {method} {url} | "
-            f"Query: {query_params} | "
-            f"Client: {client_host} | "
-            f"Status: {response.status_code} | "
-            f"Time: {process_time:.3f}s"
-        )
-
-        # Log based on status code
-        if response.status_code >= 500:
-            # Server errors
-            print(f"ERROR: {log_msg}")
-        elif response.status_code >= 400:
-            # Client errors
-            print(f"WARNING: {log_msg}")
-        else:
-            # Success responses
-            print(f"INFO: {log_msg}")
-
-        return response
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Run background tasks for the lifetime of the application."""
+    log_writer.start()
+    # Fails startup if an email template the app uses is missing
+    email_templates.load()
+    # Calibrating the bcrypt cost blocks, so do it off the event loop
+    await asyncio.to_thread(password_service.start)
+    tasks = [asyncio.create_task(system_sampler.monitor())]
+    if replica_set:
+        tasks.append(asyncio.create_task(replica_set.monitor()))
+    # Probe once before serving so readiness starts from a real result
+    await dependency_registry.check_all()
+    tasks.append(asyncio.create_task(dependency_registry.monitor()))
+    if settings.emails_enabled:
+        tasks.append(asyncio.create_task(outbox_dispatcher.run()))
+    yield
+    for task in tasks:
+        task.cancel()
+    # Let each task finish its cleanup before the resources it uses go away
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # Deliver the emails still queued before the process exits
+    await mailer.stop()
+    # Waits for the hashes in flight, then stops the worker processes
+    await asyncio.to_thread(password_service.shutdown)
+    mark_process_dead()
+    log_writer.stop()
 
 
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
@@ -67,8 +65,21 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
+
+@app.exception_handler(PasswordServiceBusy)
+async def password_service_busy_handler(
+    _request: Request, _exc: PasswordServiceBusy
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many password operations, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Define specific origins that are allowed to access the API
 origins = [
     "http://localhost",
@@ -90,9 +101,18 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Add request logging middleware
+# Add request metrics and logging middleware
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
 
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus metrics in the text exposition format."""
+    content, media_type = render_metrics()
+    return Response(content, media_type=media_type)
+
+
 # Add health check endpoints directly to the main app (no authentication required)
 @app.get("/health", tags=["Health"], status_code=status.HTTP_200_OK)
 async def health_check():
@@ -107,33 +127,8 @@ async def health_check():
             "git_hash": os.environ.get("GIT_HASH", "unknown"),
         }
 
-        # Try to get system metrics if psutil is available
-        try:
-            import psutil
-            memory_usage = psutil.virtual_memory().percent
-            cpu_usage = psutil.cpu_percent(interval=0.1)
-            # Use a fixed, safe path for disk usage check
-            safe_path = os.path.abspath(os.sep)
-            disk_usage = psutil.disk_usage(safe_path).percent
-
-            # Check if resource usage is within acceptable limits
-            resource_status = "healthy"
-            if memory_usage > 90 or cpu_usage > 90 or disk_usage > 90:
-                resource_status = "degraded"
-
-            # Add system metrics to the response
-            health_data["system"] = {
-                "status": resource_status,
-                "memory_usage_percent": memory_usage,
-                "cpu_usage_percent": cpu_usage,
-                "disk_usage_percent": disk_usage,
-            }
-        except ImportError:
-            # If psutil is not available, just provide basic health check
-            health_data["system"] = {
-                "status": "unknown",
-                "message": "Detailed system metrics not available (psutil not installed)",
-            }
+        # Sampled in the background; probes never wait on psutil
+        health_data["system"] = system_sampler.snapshot()
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -149,47 +144,28 @@ async def health_check():
             },
         )
 
+
 @app.get("/health/readiness", tags=["Health"], status_code=status.HTTP_200_OK)
 async def readiness_check():
     """Readiness check for orchestration systems like Kubernetes.
 
-    Verifies if the application is ready to handle traffic.
+    Verifies if the application is ready to handle traffic, from the latest
+    background probe of each dependency.
     """
-    try:
-        # Check database connectivity
-        from sqlalchemy import text as sql_text
-
-        from app.db.session import engine
+    ready = dependency_registry.ready
+    database = dependency_registry.dependencies["database"]
+    return JSONResponse(
+        status_code=(
+            status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        content={
+            "status": "ready" if ready else "not ready",
+            "timestamp": datetime.now().isoformat(),
+            "database": "connected" if database.healthy else "error",
+            "dependencies": dependency_registry.status(),
+        },
+    )
 
-        db_status = "error"
-        with engine.connect() as connection:
-            result = connection.execute(sql_text("SELECT 1"))
-            if result.scalar() == 1:
-                db_status = "connected"
-
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={
-                "status": "ready",
-                "timestamp": datetime.now().isoformat(),
-                "database": db_status,
-                "dependencies": {
-                    "database": db_status == "connected"
-                }
-            },
-        )
-    except Exception as e:
-        return JSONResponse(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={
-                "status": "not ready",
-                "timestamp": datetime.now().isoformat(),
-                "error": str(e),
-                "dependencies": {
-                    "database": False
-                }
-            },
-        )
 
 @app.get("/health/liveness", tags=["Health"], status_code=status.HTTP_200_OK)
 async def liveness_check():
@@ -207,6 +183,7 @@ async def liveness_check():
         # Try to get uptime if psutil is available
         try:
             import psutil
+
             uptime_seconds = int(time.time() - psutil.boot_time())
             liveness_data["uptime_seconds"] = uptime_seconds
         except ImportError:
@@ -226,4 +203,5 @@ async def liveness_check():
             },
         )
 
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,6 +1,16 @@
 from sqlmodel import SQLModel
 
-from .item import Item, ItemBase, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate
+from .email import OUTBOX_DEAD, OUTBOX_PENDING, OUTBOX_SENT, EmailOutbox
+from .item import (
+    Item,
+    ItemBase,
+    ItemBulkError,
+    ItemCreate,
+    ItemPublic,
+    ItemsBulkCreated,
+    ItemsPublic,
+    ItemUpdate,
+)
 from .token import Message, NewPassword, Token, TokenPayload
 from .user import (
     UpdatePassword,
@@ -16,11 +26,18 @@ from .user import (
 
 __all__ = [
     "SQLModel",
+    # Email outbox
+    "EmailOutbox",
+    "OUTBOX_DEAD",
+    "OUTBOX_PENDING",
+    "OUTBOX_SENT",
     # Item models
     "Item",
     "ItemBase",
+    "ItemBulkError",
     "ItemCreate",
     "ItemPublic",
+    "ItemsBulkCreated",
     "ItemsPublic",
     "ItemUpdate",
     # Token models
@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Index, Text, func
+from sqlmodel import Field, SQLModel
+
+# Outbox row states: pending until delivered (sent) or out of attempts (dead)
+OUTBOX_PENDING = "pending"
+OUTBOX_SENT = "sent"
+OUTBOX_DEAD = "dead"
+
+
+# Emails written with the change that triggers them and delivered later by
+# the outbox dispatcher (app.core.outbox)
+class EmailOutbox(SQLModel, table=True):
+    __tablename__ = "email_outbox"
+    # Serves both the dispatcher's scan for due pending rows and the
+    # per-status depth counts
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str = Field(max_length=998)
+    html_content: str = Field(sa_column=Column(Text, nullable=False))
+    status: str = Field(default=OUTBOX_PENDING, max_length=16)
+    attempts: int = 0
+    last_error: str | None = Field(default=None, sa_column=Column(Text))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now()
+        ),
+    )
+    next_attempt_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now()
+        ),
+    )
+    sent_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
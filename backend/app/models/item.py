@@ -1,5 +1,8 @@
 import uuid
+from datetime import datetime, timezone
+from typing import Any
 
+from sqlalchemy import Column, DateTime, Index, func
 from sqlmodel import Field, Relationship, SQLModel
 
 from .user import User
@@ -23,11 +26,34 @@ class ItemUpdate(ItemBase):
 
 # Database model, database table inferred from class name
 class Item(ItemBase, table=True):
+    # Keyset pagination walks (created_at, id), optionally within an owner
+    __table_args__ = (
+        Index("ix_item_created_at_id", "created_at", "id"),
+        Index("ix_item_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     title: str = Field(max_length=255)
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now()
+        ),
+    )
+    # Bumped on every ORM update; an item's ETag and those of the listing
+    # pages it appears on are derived from it
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(
+            DateTime(timezone=True),
+            nullable=False,
+            server_default=func.now(),
+            onupdate=lambda: datetime.now(timezone.utc),
+        ),
+    )
     owner: User | None = Relationship(back_populates="items")
 
 
@@ -40,3 +66,19 @@ class ItemPublic(ItemBase):
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
     count: int
+    # True when count is the planner estimate rather than an exact count
+    count_estimated: bool = False
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+
+class ItemBulkError(SQLModel):
+    index: int
+    errors: list[dict[str, Any]]
+
+
+class ItemsBulkCreated(SQLModel):
+    # Ids of the created items, in the order of the valid input rows
+    ids: list[uuid.UUID]
+    count: int
+    errors: list[ItemBulkError] = []
@@ -1,7 +1,9 @@
 import uuid
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
 from pydantic import EmailStr
+from sqlalchemy import Column, DateTime, Index, func, text
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -45,8 +47,46 @@ class UpdatePassword(SQLModel):
 
 # Database model, database table inferred from class name
 class User(UserBase, table=True):
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id)
+        Index("ix_user_created_at_id", "created_at", "id"),
+        # Small partial indexes for the flag filters; the predicates match how
+        # each dialect renders a bare boolean column in a WHERE clause
+        Index(
+            "ix_user_is_superuser_partial",
+            "id",
+            postgresql_where=text("is_superuser"),
+            sqlite_where=text("is_superuser = 1"),
+        ),
+        Index(
+            "ix_user_is_active_partial",
+            "id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active = 1"),
+        ),
+        # Emails are unique regardless of case
+        Index("uq_user_email_lower", text("lower(email)"), unique=True),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now()
+        ),
+    )
+    # Bumped on every ORM update; /users/me and the listing pages a user
+    # appears on derive their ETags from it
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(
+            DateTime(timezone=True),
+            nullable=False,
+            server_default=func.now(),
+            onupdate=lambda: datetime.now(timezone.utc),
+        ),
+    )
     items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
 
 
@@ -58,3 +98,7 @@ class UserPublic(UserBase):
 class UsersPublic(SQLModel):
     data: list[UserPublic]
     count: int
+    # True when count is the planner estimate rather than an exact count
+    count_estimated: bool = False
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
@@ -29,3 +29,7 @@ class ItemPublic(ItemBase):
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
     count: int
+    # True when count is the planner estimate rather than an exact count
+    count_estimated: bool = False
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
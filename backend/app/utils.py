@@ -1,72 +1,71 @@
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any
 
 import emails
-from emails.template import JinjaTemplate
+from emails.backend.response import SMTPResponse
 from fastapi import HTTPException, status
 from jose import jwt
 from pydantic.networks import EmailStr
 
 from app.core.config import settings
+from app.core.email_templates import email_templates
+from app.core.mail import mailer
 
+NEW_ACCOUNT_TEMPLATE = email_templates.require("new_account.html")
+RESET_PASSWORD_TEMPLATE = email_templates.require("reset_password.html")
+TEST_EMAIL_TEMPLATE = email_templates.require("test_email.html")
 
-def send_email(
-    email_to: EmailStr,
-    subject: str,
-    html_content: str,
-    environment: dict[str, Any] | None = None,
-) -> None:
-    """Send an email using the configured SMTP server or log it in development."""
-    assert settings.EMAILS_FROM_EMAIL, "EMAILS_FROM_EMAIL must be set"
 
-    # If SMTP is not configured, just log the email content
-    if not settings.EMAILS_ENABLED:
-        logging.info(f"Simulating email to {email_to}")
-        logging.info(subject)
-        logging.info(html_content)
-        return
+@dataclass
+class EmailData:
+    html_content: str
+    subject: str
+
 
-    message = emails.Message(
+def build_email(email_to: EmailStr, subject: str, html_content: str) -> emails.Message:
+    """Build a message from already rendered HTML, which is sent as is."""
+    assert settings.EMAILS_FROM_EMAIL, "EMAILS_FROM_EMAIL must be set"
+    return emails.Message(
         subject=subject,
-        html=JinjaTemplate(html_content),
+        html=html_content,
         mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+        mail_to=email_to,
     )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
 
-    response = message.send(to=email_to, render=environment, smtp=smtp_options)
-    logging.info(f"send email result: {response}")
 
+def log_email(email_to: EmailStr, subject: str, html_content: str) -> None:
+    """Log an email instead of sending it, for when SMTP is not configured."""
+    logging.info(f"Simulating email to {email_to}")
+    logging.info(subject)
+    logging.info(html_content)
 
-def generate_test_email() -> emails.Message:
-    """Generate a test email with a template."""
-    subject = "Test email"
-    html_content = "<p>This is a test email. Congratulations, it worked!</p>"
-    return emails.Message(subject=subject, html=JinjaTemplate(html_content))
 
+async def send_email_async(
+    email_to: EmailStr,
+    subject: str,
+    html_content: str,
+    wait: bool = False,
+) -> SMTPResponse | None:
+    """Queue an email on the pooled mailer and return without waiting for it.
 
-def generate_new_account_email(email_to: EmailStr) -> None:
-    """Send a welcome email to new users."""
-    project_name = settings.PROJECT_NAME
-    subject = f"Welcome to {project_name}"
-    with open(settings.EMAIL_TEMPLATES_DIR / "new_account.html") as f:
-        template_str = f.read()
+    With ``wait``, return the server's response once the email is sent.
+    """
+    if not settings.emails_enabled:
+        log_email(email_to, subject, html_content)
+        return None
 
-    send_email(
-        email_to=email_to,
-        subject=subject,
-        html_content=template_str,
-        environment={
-            "project_name": settings.PROJECT_NAME,
-            "email": email_to,
-        },
+    future = mailer.submit(build_email(email_to, subject, html_content))
+    return await future if wait else None
+
+
+def generate_test_email(email_to: EmailStr) -> EmailData:
+    """Generate a test email with a template."""
+    subject = f"{settings.PROJECT_NAME} - Test email"
+    html_content = email_templates.render(
+        TEST_EMAIL_TEMPLATE, project_name=settings.PROJECT_NAME, email=email_to
     )
+    return EmailData(html_content=html_content, subject=subject)
 
 
 def generate_password_reset_token(email: str, expires_delta: int = None) -> str:
@@ -96,29 +95,3 @@ def verify_password_reset_token(token: str) -> str:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid token",
         )
-
-
-def send_reset_password_email(
-    email_to: EmailStr,
-    email: str,
-    token: str,
-) -> None:
-    """Send a password reset email to the user."""
-    project_name = settings.PROJECT_NAME
-    subject = f"{project_name} - Password recovery for user {email}"
-    with open(settings.EMAIL_TEMPLATES_DIR / "reset_password.html") as f:
-        template_str = f.read()
-    server_host = settings.SERVER_HOST
-    link = f"{server_host}/reset-password?token={token}"
-    send_email(
-        email_to=email_to,
-        subject=subject,
-        html_content=template_str,
-        environment={
-            "project_name": settings.PROJECT_NAME,
-            "username": email,
-            "email": email_to,
-            "valid_hours": settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS,
-            "link": link,
-        },
-    )
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark the crud, security and serialization hot paths against a baseline.
+
+Each benchmark is timed over enough calls to take ``--min-time`` seconds,
+``--repeat`` times, and reported as the median and fastest time per call.
+The crud benchmarks and ``deps.get_current_user`` run on a temporary SQLite
+database holding 10/100/1000 users (``--sizes``); ``get_users`` and the
+serialization of ``ItemsPublic``/``UsersPublic`` fetch or render that many
+rows. bcrypt is pinned to ``--rounds`` so the hashing benchmarks do not depend
+on the calibrated cost.
+
+With ``--baseline``, each median is compared with the stored one and the run
+fails if any is more than ``--threshold`` times slower. Baselines are only
+comparable on the machine that wrote them, which is warned about, and the
+hashing benchmarks only at the same ``--rounds``, which are skipped otherwise;
+refresh a baseline with ``--output``.
+
+Usage:
+    python scripts/bench_hotpaths.py --output scripts/baselines/hotpaths.json
+    python scripts/bench_hotpaths.py --baseline scripts/baselines/hotpaths.json
+    python scripts/bench_hotpaths.py --only security --repeat 10
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any
+
+# Add the parent directory to the Python path to make 'app' importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+from sqlmodel import Session, SQLModel, create_engine  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.api import deps  # noqa: E402
+from app.core import hashing, security  # noqa: E402
+from app.models import (  # noqa: E402
+    Item,
+    ItemsPublic,
+    User,
+    UserCreate,
+    UsersPublic,
+    UserUpdate,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger("bench_hotpaths")
+
+GROUPS = ("crud", "security", "deps", "serialization")
+# Benchmarks that hash a password, and so scale with --rounds
+HASHING_BENCHMARKS = (
+    "crud.create_user",
+    "security.get_password_hash",
+    "security.verify_password",
+)
+
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> dict[str, Any]:
+    """Time ``fn`` like ``timeit``: calibrate the loop count, then repeat."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - start) / loops)
+    return {
+        "median_us": round(statistics.median(timings) * 1e6, 2),
+        "min_us": round(min(timings) * 1e6, 2),
+        "loops": loops,
+    }
+
+
+def make_users(n: int, hashed_password: str) -> list[User]:
+    now = datetime.now(timezone.utc)
+    return [
+        User(
+            email=f"bench-{n}-{i}@example.com",
+            hashed_password=hashed_password,
+            full_name=f"User {i}",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def make_items(n: int) -> list[Item]:
+    owner_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    return [
+        Item(
+            id=uuid.uuid4(),
+            title=f"Item {i}",
+            description="Lorem ipsum dolor sit amet" if i % 2 else None,
+            owner_id=owner_id,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+@contextmanager
+def sqlite_database() -> Iterator[str]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        SQLModel.metadata.create_all(engine)
+        engine.dispose()
+        yield path
+
+
+def bench_crud(
+    path: str, sizes: list[int], hashed_password: str, run: Callable[..., None]
+) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    counter = itertools.count()
+    with Session(engine) as session:
+        for n in sizes:
+            session.exec(delete(User))  # type: ignore[call-overload]
+            session.add_all(make_users(n, hashed_password))
+            session.commit()
+            bench_crud_size(session, n, counter, run)
+    engine.dispose()
+
+
+def bench_crud_size(
+    session: Session, n: int, counter: Iterator[int], run: Callable[..., None]
+) -> None:
+    email = f"bench-{n}-{n // 2}@example.com"
+    user = crud.get_user_by_email(session, email)
+    assert user is not None
+
+    def create_user() -> None:
+        user_create = UserCreate(
+            email=f"created-{next(counter)}@example.com",
+            password="benchmark-password",
+        )
+        crud.create_user(session, user_create)
+
+    def update_user() -> None:
+        user_in = UserUpdate(full_name=f"Renamed {next(counter)}")
+        crud.update_user(session, user_in, user)
+
+    run("crud.get_user_by_email", n, lambda: crud.get_user_by_email(session, email))
+    run("crud.get_users", n, lambda: crud.get_users(session, limit=n))
+    run("crud.create_user", n, create_user)
+    run("crud.update_user", n, update_user)
+
+
+def bench_security(hashed_password: str, run: Callable[..., None]) -> None:
+    delta = timedelta(minutes=30)
+    token = security.create_access_token("bench@example.com", delta)
+
+    def decode_uncached() -> None:
+        security.token_cache.clear()
+        security.decode_access_token(token)
+
+    run(
+        "security.create_access_token",
+        None,
+        lambda: security.create_access_token("bench@example.com", delta),
+    )
+    run("security.decode_access_token.uncached", None, decode_uncached)
+    run(
+        "security.decode_access_token.cached",
+        None,
+        lambda: security.decode_access_token(token),
+    )
+    run(
+        "security.verify_password",
+        None,
+        lambda: security.verify_password("benchmark-password", hashed_password),
+    )
+    run(
+        "security.get_password_hash",
+        None,
+        lambda: security.get_password_hash("benchmark-password"),
+    )
+
+
+def bench_deps(
+    path: str, sizes: list[int], hashed_password: str, run: Callable[..., None]
+) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", poolclass=NullPool
+    )
+    loop = asyncio.new_event_loop()
+
+    async def current_user(token: str) -> None:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            await deps.get_current_user(session, token)
+
+    def bench_size(n: int) -> None:
+        with Session(engine) as session:
+            session.exec(delete(User))  # type: ignore[call-overload]
+            session.add_all(make_users(n, hashed_password))
+            session.commit()
+        token = security.create_access_token(
+            f"bench-{n}-{n // 2}@example.com", timedelta(minutes=30)
+        )
+
+        def uncached() -> None:
+            security.token_cache.clear()
+            crud.principal_cache.clear()
+            loop.run_until_complete(current_user(token))
+
+        run("deps.get_current_user.uncached", n, uncached)
+        run(
+            "deps.get_current_user.cached",
+            n,
+            lambda: loop.run_until_complete(current_user(token)),
+        )
+
+    try:
+        for n in sizes:
+            bench_size(n)
+    finally:
+        loop.run_until_complete(async_engine.dispose())
+        loop.close()
+        engine.dispose()
+
+
+def bench_serialization(
+    sizes: list[int], hashed_password: str, run: Callable[..., None]
+) -> None:
+    for n in sizes:
+        items, users = make_items(n), make_users(n, hashed_password)
+        run("serialization.ItemsPublic", n, partial(render, ItemsPublic, items))
+        run("serialization.UsersPublic", n, partial(render, UsersPublic, users))
+
+
+def render(model: type[ItemsPublic | UsersPublic], rows: list[Any]) -> str:
+    """Validate ``rows`` into a page, as a response model does, and dump it."""
+    return model(data=rows, count=len(rows)).model_dump_json()
+
+
+def bench(args: argparse.Namespace) -> dict[str, Any]:
+    hashing.configure(args.rounds)
+    hashed_password = hashing.get_password_hash("benchmark-password")
+    results: dict[str, Any] = {}
+
+    def run(name: str, size: int | None, fn: Callable[[], Any]) -> None:
+        key = name if size is None else f"{name}[{size}]"
+        results[key] = measure(fn, args.repeat, args.min_time)
+        logger.info(
+            f"{key:<46} median {results[key]['median_us']:>12} us | "
+            f"min {results[key]['min_us']:>12} us"
+        )
+
+    groups = args.only or GROUPS
+    with sqlite_database() as path:
+        if "crud" in groups:
+            bench_crud(path, args.sizes, hashed_password, run)
+        if "security" in groups:
+            bench_security(hashed_password, run)
+        if "deps" in groups:
+            bench_deps(path, args.sizes, hashed_password, run)
+    if "serialization" in groups:
+        bench_serialization(args.sizes, hashed_password, run)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "bcrypt_rounds": args.rounds,
+            "repeat": args.repeat,
+            "sizes": args.sizes,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Log each benchmark against the baseline; return the names that regressed.
+
+    Benchmarks that hash are skipped when the baseline used another bcrypt
+    cost, since their timings are not comparable.
+    """
+    meta, base_meta = results["meta"], baseline.get("meta", {})
+    for key in ("python", "machine"):
+        if meta[key] != base_meta.get(key):
+            logger.warning(
+                f"Baseline {key} is {base_meta.get(key)}, not {meta[key]}; "
+                "timings may not be comparable"
+            )
+    skipped: tuple[str, ...] = ()
+    if meta["bcrypt_rounds"] != base_meta.get("bcrypt_rounds"):
+        logger.warning(
+            f"Baseline used bcrypt cost {base_meta.get('bcrypt_rounds')}, not "
+            f"{meta['bcrypt_rounds']}; skipping {', '.join(HASHING_BENCHMARKS)}"
+        )
+        skipped = HASHING_BENCHMARKS
+
+    regressed = []
+    for key, result in results["results"].items():
+        base = baseline["results"].get(key)
+        if base is None or key.split("[")[0] in skipped:
+            continue
+        ratio = result["median_us"] / base["median_us"]
+        marker = ""
+        if ratio > threshold:
+            regressed.append(key)
+            marker = "  REGRESSED"
+        logger.info(f"{key:<46} x{ratio:.2f} vs baseline{marker}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Seconds per timed run"
+    )
+    parser.add_argument("--rounds", type=int, default=hashing.MIN_ROUNDS)
+    parser.add_argument("--only", nargs="+", choices=GROUPS)
+    parser.add_argument("--baseline", help="Compare with the results in this file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Slowdown over the baseline median that counts as a regression",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = bench(args)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        logger.info(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            logger.error(
+                f"{len(regressed)} benchmarks regressed: {', '.join(regressed)}"
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Compare the cost of rendering item pages with and without FAST_JSON_RESPONSES.
+
+The default path is what FastAPI does for a route with a response model: build
+``ItemsPublic`` from the rows, validate and serialize it again against the
+response model, then encode it with ``JSONResponse``. The fast path copies the
+public fields from the rows and renders them with ``FastJSONResponse``. No
+database is needed; the rows are built in memory.
+
+Usage:
+    python scripts/bench_serialization.py --sizes 100 1000 10000
+    python scripts/bench_serialization.py --repeat 50 --output serialization.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from typing import Any
+
+# Add the parent directory to the Python path to make 'app' importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app.api import responses  # noqa: E402
+from app.api.responses import FastJSONResponse, public_rows  # noqa: E402
+from app.models import Item, ItemPublic, ItemsPublic  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger("bench_serialization")
+
+response_field = create_model_field("Response", ItemsPublic, mode="serialization")
+
+
+def make_rows(n: int) -> list[Item]:
+    owner_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    return [
+        Item(
+            id=uuid.uuid4(),
+            title=f"Item {i}",
+            description="Lorem ipsum dolor sit amet" if i % 2 else None,
+            owner_id=owner_id,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def page_fields(rows: list[Item]) -> dict[str, Any]:
+    return {
+        "count": len(rows),
+        "count_estimated": False,
+        "next_cursor": None,
+        "previous_cursor": None,
+    }
+
+
+async def render_default(rows: list[Item]) -> bytes:
+    content = ItemsPublic(data=rows, **page_fields(rows))
+    payload = await serialize_response(field=response_field, response_content=content)
+    return JSONResponse(payload).body
+
+
+async def render_fast(rows: list[Item]) -> bytes:
+    return FastJSONResponse(
+        {"data": public_rows(rows, ItemPublic), **page_fields(rows)}
+    ).body
+
+
+async def best_ms(
+    render: Callable[[list[Item]], Awaitable[bytes]], rows: list[Item], repeat: int
+) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await render(rows)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def bench(sizes: list[int], repeat: int) -> dict[str, Any]:
+    results: dict[str, Any] = {"orjson": responses.orjson is not None, "sizes": {}}
+    for n in sizes:
+        rows = make_rows(n)
+        default, fast = await render_default(rows), await render_fast(rows)
+        assert json.loads(default) == json.loads(fast)
+        default_ms = await best_ms(render_default, rows, repeat)
+        fast_ms = await best_ms(render_fast, rows, repeat)
+        results["sizes"][n] = {
+            "default_ms_per_1k": round(default_ms * 1000 / n, 3),
+            "fast_ms_per_1k": round(fast_ms * 1000 / n, 3),
+            "speedup": round(default_ms / fast_ms, 2),
+        }
+        logger.info(
+            f"{n:>6} rows: default {results['sizes'][n]['default_ms_per_1k']} ms/1k | "
+            f"fast {results['sizes'][n]['fast_ms_per_1k']} ms/1k | "
+            f"x{results['sizes'][n]['speedup']}"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Runs per size; the fastest is kept"
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args.sizes, args.repeat))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
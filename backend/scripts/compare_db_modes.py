@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Compare request throughput of the sync and async database paths.
+
+Two minimal apps run the same user lookup: one as a ``def`` route on a sync
+``Session`` (dispatched to the AnyIO threadpool), one as an ``async def`` route
+on an ``AsyncSession``. Both are driven in-process by concurrent httpx clients
+against the database configured in the settings.
+
+Usage:
+    python scripts/compare_db_modes.py --requests 2000 --concurrency 200
+    python scripts/compare_db_modes.py --db-latency-ms 20 --output modes.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Any
+
+# Add the parent directory to the Python path to make 'app' importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.api.deps import SessionDep  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.db import engine  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger("compare_db_modes")
+
+
+def build_sync_app(email: str, latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/lookup")
+    def lookup() -> dict[str, Any]:
+        with Session(engine) as session:
+            if latency:
+                session.execute(text("SELECT pg_sleep(:s)"), {"s": latency})
+            user = crud.get_user_by_email(session, email)
+        return {"found": user is not None}
+
+    return app
+
+
+def build_async_app(email: str, latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/lookup")
+    async def lookup(session: SessionDep) -> dict[str, Any]:
+        if latency:
+            await session.execute(text("SELECT pg_sleep(:s)"), {"s": latency})
+        user = await crud.get_user_by_email_async(session, email)
+        return {"found": user is not None}
+
+    return app
+
+
+async def drive(app: FastAPI, requests: int, concurrency: int) -> dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        async def one() -> None:
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await c.get("/lookup")
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+async def compare(requests: int, concurrency: int, latency: float) -> dict[str, Any]:
+    results = {}
+    for mode, build in (("sync", build_sync_app), ("async", build_async_app)):
+        app = build(settings.FIRST_SUPERUSER, latency)
+        # Warm up connections so pool growth is not measured
+        await drive(app, min(concurrency, requests), concurrency)
+        results[mode] = await drive(app, requests, concurrency)
+        logger.info(
+            f"{mode:>5}: {results[mode]['throughput_rps']:>8} req/s | "
+            f"p50 {results[mode]['p50_ms']} ms | p99 {results[mode]['p99_ms']} ms | "
+            f"errors {results[mode]['errors']}"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument(
+        "--db-latency-ms",
+        type=float,
+        default=0.0,
+        help="Extra server-side latency per request, emulated with pg_sleep",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        compare(args.requests, args.concurrency, args.db_latency_ms / 1000)
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
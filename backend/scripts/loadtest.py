@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Load-test the API with a realistic mix of requests and report latency percentiles.
+
+Concurrent async clients each log in as one of the seeded users and then loop
+over a weighted mix of login, ``GET /users/me``, ``GET /items/`` paging (by
+cursor, restarting at the end) and item create/update/delete for the duration
+of the run. Throughput, errors and p50/p95/p99 latencies are reported per
+endpoint.
+
+The users and their items are seeded through the API as the first superuser
+and deleted afterwards, unless ``--keep`` is passed. By default the app runs
+in-process on the database configured in the settings (e.g. the ``db``
+service of docker-compose.yml); ``--sqlite`` runs it on a SQLite file instead,
+and ``--base-url`` drives a server that is already running.
+
+Usage:
+    python scripts/loadtest.py --sqlite loadtest.db --clients 50 --duration 30
+    python scripts/loadtest.py --users 100 --items-per-user 500 --output load.json
+    python scripts/loadtest.py --base-url http://localhost:8000 --mix me=10,login=0
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+# Add the parent directory to the Python path to make 'app' importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncEngine  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+
+# The report goes to stdout through this logger only; the root logger is left
+# to the app, whose log writer would otherwise print every line again as JSON
+logger = logging.getLogger("loadtest")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_report_handler = logging.StreamHandler(sys.stdout)
+_report_handler.setFormatter(logging.Formatter("%(message)s"))
+logger.addHandler(_report_handler)
+# One line per request would drown the report
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+API = settings.API_V1_STR
+DEFAULT_MIX = {
+    "login": 1,
+    "me": 4,
+    "items_page": 6,
+    "item_create": 2,
+    "item_update": 2,
+    "item_delete": 1,
+}
+SEED_PASSWORD = "loadtest-password"
+
+
+@dataclass
+class Stats:
+    """Latencies and failures of the requests made to one endpoint."""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, status_code: int, elapsed: float) -> None:
+        self.latencies.append(elapsed)
+        self.statuses[status_code] += 1
+        if status_code >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        summary: dict[str, Any] = {
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "statuses": dict(sorted(self.statuses.items())),
+            "throughput_rps": round(len(self.latencies) / elapsed, 1),
+        }
+        if self.latencies:
+            summary.update(latency_ms(self.latencies))
+        return summary
+
+
+def latency_ms(latencies: list[float]) -> dict[str, float]:
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    else:
+        quantiles = latencies * 99
+    return {
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse ``name=weight,...`` over the default mix."""
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, value.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(
+                f"unknown operation {name!r}, expected one of {', '.join(DEFAULT_MIX)}"
+            )
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("at least one operation needs a weight")
+    return mix
+
+
+class Recorder:
+    """Times requests and files them under their endpoint."""
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        self.client = client
+        self.stats: dict[str, Stats] = defaultdict(Stats)
+
+    async def request(
+        self, endpoint: str, method: str, url: str, **kwargs: Any
+    ) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            logger.debug(f"{endpoint} failed: {e!r}")
+            self.stats[endpoint].record(599, time.perf_counter() - start)
+            return None
+        self.stats[endpoint].record(response.status_code, time.perf_counter() - start)
+        return response
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> dict[str, str]:
+    response = await client.post(
+        f"{API}/login/access-token", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def seed(
+    client: httpx.AsyncClient, users: int, items_per_user: int
+) -> list[tuple[str, str]]:
+    """Create ``users`` users with ``items_per_user`` items each; return (id, email)."""
+    admin = await login(
+        client, settings.FIRST_SUPERUSER, settings.FIRST_SUPERUSER_PASSWORD
+    )
+    run = uuid.uuid4().hex[:8]
+    semaphore = asyncio.Semaphore(10)
+
+    async def create(n: int) -> tuple[str, str]:
+        email = f"loadtest-{run}-{n}@example.com"
+        async with semaphore:
+            response = await client.post(
+                f"{API}/users/",
+                headers=admin,
+                json={"email": email, "password": SEED_PASSWORD},
+            )
+            response.raise_for_status()
+            user_id = response.json()["id"]
+            headers = await login(client, email, SEED_PASSWORD)
+            chunk = settings.ITEMS_BULK_MAX_ROWS
+            for start in range(0, items_per_user, chunk):
+                rows = [
+                    {"title": f"Item {i}", "description": f"Seeded by run {run}"}
+                    for i in range(start, min(start + chunk, items_per_user))
+                ]
+                response = await client.post(
+                    f"{API}/items/bulk", headers=headers, json=rows
+                )
+                response.raise_for_status()
+        return user_id, email
+
+    started = time.perf_counter()
+    seeded = await asyncio.gather(*(create(n) for n in range(users)))
+    logger.info(
+        f"Seeded {users} users with {items_per_user} items each "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return seeded
+
+
+async def cleanup(client: httpx.AsyncClient, user_ids: list[str]) -> None:
+    admin = await login(
+        client, settings.FIRST_SUPERUSER, settings.FIRST_SUPERUSER_PASSWORD
+    )
+    semaphore = asyncio.Semaphore(10)
+
+    async def delete(user_id: str) -> None:
+        async with semaphore:
+            await client.delete(f"{API}/users/{user_id}", headers=admin)
+
+    await asyncio.gather(*(delete(user_id) for user_id in user_ids))
+
+
+class VirtualUser:
+    """One client working through the mix as a seeded user."""
+
+    def __init__(self, recorder: Recorder, email: str, page_size: int) -> None:
+        self.recorder = recorder
+        self.email = email
+        self.page_size = page_size
+        self.headers: dict[str, str] = {}
+        self.cursor: str | None = None
+        self.created: list[str] = []
+
+    async def login(self) -> None:
+        response = await self.recorder.request(
+            "POST /login/access-token",
+            "POST",
+            f"{API}/login/access-token",
+            data={"username": self.email, "password": SEED_PASSWORD},
+        )
+        if response is not None and response.status_code == 200:
+            token = response.json()["access_token"]
+            self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def me(self) -> None:
+        await self.recorder.request(
+            "GET /users/me", "GET", f"{API}/users/me", headers=self.headers
+        )
+
+    async def items_page(self) -> None:
+        params: dict[str, Any] = {"limit": self.page_size}
+        if self.cursor:
+            params["after"] = self.cursor
+        response = await self.recorder.request(
+            "GET /items/", "GET", f"{API}/items/", headers=self.headers, params=params
+        )
+        if response is not None and response.status_code == 200:
+            self.cursor = response.json().get("next_cursor")
+
+    async def item_create(self) -> None:
+        response = await self.recorder.request(
+            "POST /items/",
+            "POST",
+            f"{API}/items/",
+            headers=self.headers,
+            json={"title": "Load test item", "description": "Created under load"},
+        )
+        if response is not None and response.status_code == 200:
+            self.created.append(response.json()["id"])
+
+    async def item_update(self) -> None:
+        if not self.created:
+            return await self.item_create()
+        await self.recorder.request(
+            "PUT /items/{id}",
+            "PUT",
+            f"{API}/items/{random.choice(self.created)}",
+            headers=self.headers,
+            json={"description": f"Updated at {time.time()}"},
+        )
+
+    async def item_delete(self) -> None:
+        if not self.created:
+            return await self.item_create()
+        item_id = self.created.pop(random.randrange(len(self.created)))
+        await self.recorder.request(
+            "DELETE /items/{id}",
+            "DELETE",
+            f"{API}/items/{item_id}",
+            headers=self.headers,
+        )
+
+    async def run(self, mix: dict[str, int], deadline: float) -> None:
+        operations: list[Callable[[], Awaitable[None]]] = [
+            getattr(self, name) for name in mix
+        ]
+        weights = list(mix.values())
+        await self.login()
+        while time.perf_counter() < deadline:
+            await random.choices(operations, weights)[0]()
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    emails: list[str],
+    *,
+    clients: int,
+    duration: float,
+    mix: dict[str, int],
+    page_size: int,
+) -> dict[str, Any]:
+    recorder = Recorder(client)
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            VirtualUser(recorder, emails[n % len(emails)], page_size).run(mix, deadline)
+            for n in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    latencies = [t for stats in recorder.stats.values() for t in stats.latencies]
+    total = Stats(latencies=latencies)
+    total.errors = sum(stats.errors for stats in recorder.stats.values())
+    for stats in recorder.stats.values():
+        for status_code, count in stats.statuses.items():
+            total.statuses[status_code] += count
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total": total.summary(elapsed),
+        "endpoints": {
+            name: stats.summary(elapsed)
+            for name, stats in sorted(recorder.stats.items())
+        },
+    }
+
+
+@contextlib.asynccontextmanager
+async def in_process_client(sqlite: str | None) -> AsyncIterator[httpx.AsyncClient]:
+    """Run the app in this process, with its lifespan, on an httpx transport."""
+    from app.main import app
+
+    # Access records would be written from this process while it is being
+    # measured, and interleaved with the report
+    logging.getLogger("app.access").disabled = True
+    engine = use_sqlite(app, sqlite) if sqlite else None
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://loadtest", timeout=60
+            ) as client:
+                yield client
+    finally:
+        if engine is not None:
+            await engine.dispose()
+
+
+def use_sqlite(app: Any, path: str) -> AsyncEngine:
+    """Point the app's sessions at a SQLite file, creating the schema if needed."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlmodel import Session, SQLModel, create_engine
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.api.deps import get_db, get_session_factory
+    from app.core.db import init_db
+
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        init_db(session)
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def get_sqlite_db() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_sqlite_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    return async_engine
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    if args.base_url:
+        client_context = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        client_context = in_process_client(args.sqlite)
+    async with client_context as client:
+        seeded = await seed(client, args.users, args.items_per_user)
+        try:
+            results = await drive(
+                client,
+                [email for _, email in seeded],
+                clients=args.clients,
+                duration=args.duration,
+                mix=args.mix,
+                page_size=args.page_size,
+            )
+        finally:
+            if not args.keep:
+                await cleanup(client, [user_id for user_id, _ in seeded])
+    results["config"] = {
+        "target": args.base_url or ("sqlite:" + args.sqlite if args.sqlite else "app"),
+        "clients": args.clients,
+        "duration_s": args.duration,
+        "users": args.users,
+        "items_per_user": args.items_per_user,
+        "page_size": args.page_size,
+        "mix": args.mix,
+    }
+    return results
+
+
+def report(results: dict[str, Any]) -> None:
+    for name, summary in {**results["endpoints"], "total": results["total"]}.items():
+        if not summary["requests"]:
+            continue
+        logger.info(
+            f"{name:<26} {summary['requests']:>7} req | "
+            f"{summary['throughput_rps']:>8} req/s | p50 {summary['p50_ms']:>8} ms | "
+            f"p95 {summary['p95_ms']:>8} ms | p99 {summary['p99_ms']:>8} ms | "
+            f"errors {summary['errors']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", help="Drive a running server at this URL")
+    target.add_argument("--sqlite", help="Run the app in-process on this SQLite file")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument("--users", type=int, default=20, help="Users to seed")
+    parser.add_argument("--items-per-user", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="Operation weights as name=weight,... over the defaults: "
+        + ",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items()),
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded data")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
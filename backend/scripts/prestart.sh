@@ -38,5 +38,12 @@ fi
 # Create initial data in DB
 python /app/backend/app/backend_pre_start.py
 
+# Metrics files left by a previous run would be aggregated with the new ones
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 # Start the FastAPI application
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+# Requests are logged by the app itself (app.core.log)
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --no-access-log
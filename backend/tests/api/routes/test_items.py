@@ -1,11 +1,19 @@
+import csv
+import io
+import json
 import uuid
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app import crud
 from app.core.config import settings
+from app.schemas import ItemCreate, UserCreate
 from tests.utils.item import create_random_item
+from tests.utils.test_db import capture_selects, test_async_engine
+from tests.utils.user import user_authentication_headers
+from tests.utils.utils import random_email, random_lower_string
 
 
 @pytest.mark.api
@@ -43,6 +51,109 @@ def test_read_item(
     assert content["owner_id"] == str(item.owner_id)
 
 
+@pytest.mark.api
+def test_read_item_conditional(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Foo"},
+    )
+    url = f"{settings.API_V1_STR}/items/{r.json()['id']}"
+    r = client.get(url, headers=normal_user_token_headers)
+    etag = r.headers["ETag"]
+
+    r = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["ETag"] == etag
+
+    client.put(url, headers=normal_user_token_headers, json={"title": "Bar"})
+    r = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["title"] == "Bar"
+    assert r.headers["ETag"] != etag
+
+
+@pytest.mark.api
+def test_read_item_conditional_other_owner(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/items/{item.id}",
+        headers={**normal_user_token_headers, "If-None-Match": "*"},
+    )
+    assert r.status_code == 400
+
+
+@pytest.mark.api
+def test_read_items_conditional(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    r = client.get(url, headers=normal_user_token_headers)
+    etag = r.headers["ETag"]
+    conditional = {**normal_user_token_headers, "If-None-Match": etag}
+
+    assert client.get(url, headers=conditional).status_code == 304
+    # Another page of the same collection is another representation
+    assert client.get(url, headers=conditional, params={"limit": 1}).status_code == 200
+
+    r = client.post(url, headers=normal_user_token_headers, json={"title": "Foo"})
+    item_url = f"{url}{r.json()['id']}"
+    r = client.get(url, headers=conditional)
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+
+    client.put(item_url, headers=normal_user_token_headers, json={"title": "Bar"})
+    r = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+
+    client.delete(item_url, headers=normal_user_token_headers)
+    r = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+
+
+@pytest.mark.api
+def test_read_items_etag_needs_no_extra_query(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    client.get(url, headers=normal_user_token_headers)  # warm the caches
+    with capture_selects(test_async_engine.sync_engine) as statements:
+        r = client.get(url, headers=normal_user_token_headers)
+        conditional = {**normal_user_token_headers, "If-None-Match": r.headers["ETag"]}
+        assert client.get(url, headers=conditional).status_code == 304
+    # One page query per request; the ETag comes from the rows it returned
+    item_selects = [s for s, _ in statements if "FROM item" in s]
+    assert len(item_selects) == 2
+
+
+@pytest.mark.api
+def test_fast_json_responses_match_default(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    monkeypatch,
+) -> None:
+    item = create_random_item(db)
+    urls = [
+        f"{settings.API_V1_STR}/items/",
+        f"{settings.API_V1_STR}/items/{item.id}",
+        f"{settings.API_V1_STR}/users/",
+    ]
+    default = [client.get(url, headers=superuser_token_headers) for url in urls]
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast = [client.get(url, headers=superuser_token_headers) for url in urls]
+    for expected, response in zip(default, fast, strict=True):
+        assert response.status_code == 200
+        assert response.json() == expected.json()
+        assert response.headers["ETag"] == expected.headers["ETag"]
+
+
 @pytest.mark.api
 def test_read_item_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
@@ -85,6 +196,167 @@ def test_read_items(
     assert len(content["data"]) >= 2
 
 
+@pytest.mark.api
+def test_read_items_cursor_pagination(client: TestClient, db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    created = sorted(
+        (
+            crud.create_item(
+                session=db, item_create=ItemCreate(title=f"item {i}"), owner_id=user.id
+            )
+            for i in range(3)
+        ),
+        key=lambda item: (item.created_at, item.id),
+    )
+    headers = user_authentication_headers(client=client, email=email, password=password)
+    url = f"{settings.API_V1_STR}/items/"
+
+    first = client.get(url, headers=headers, params={"limit": 2}).json()
+    assert [i["id"] for i in first["data"]] == [str(i.id) for i in created[:2]]
+    assert first["count"] == 3
+    assert first["previous_cursor"] is None
+
+    second = client.get(
+        url, headers=headers, params={"limit": 2, "after": first["next_cursor"]}
+    ).json()
+    assert [i["id"] for i in second["data"]] == [str(created[2].id)]
+    assert second["next_cursor"] is None
+
+    back = client.get(
+        url, headers=headers, params={"limit": 2, "before": second["previous_cursor"]}
+    ).json()
+    assert back["data"] == first["data"]
+
+
+@pytest.mark.api
+def test_read_items_count_is_invalidated(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    before = client.get(url, headers=normal_user_token_headers).json()
+    assert before["count_estimated"] is False
+
+    r = client.post(url, headers=normal_user_token_headers, json={"title": "Foo"})
+    assert r.status_code == 200
+    after_create = client.get(url, headers=normal_user_token_headers).json()
+    assert after_create["count"] == before["count"] + 1
+
+    r = client.delete(f"{url}{r.json()['id']}", headers=normal_user_token_headers)
+    assert r.status_code == 200
+    after_delete = client.get(url, headers=normal_user_token_headers).json()
+    assert after_delete["count"] == before["count"]
+
+
+@pytest.mark.api
+def test_read_items_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"after": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.api
+def test_create_items_bulk(client: TestClient, db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    crud.create_user(session=db, user_create=UserCreate(email=email, password=password))
+    headers = user_authentication_headers(client=client, email=email, password=password)
+    rows = [{"title": f"bulk {i}", "description": "d"} for i in range(5)]
+
+    r = client.post(f"{settings.API_V1_STR}/items/bulk", headers=headers, json=rows)
+    assert r.status_code == 200
+    content = r.json()
+    assert content["count"] == 5
+    assert content["errors"] == []
+
+    listed = client.get(f"{settings.API_V1_STR}/items/", headers=headers).json()
+    assert listed["count"] == 5
+    assert [i["id"] for i in listed["data"]] == content["ids"]
+    assert [i["title"] for i in listed["data"]] == [row["title"] for row in rows]
+
+
+@pytest.mark.api
+def test_create_items_bulk_invalid_rows(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/bulk"
+    rows = [{"title": "ok"}, {"title": ""}, "not an item", {"title": "also ok"}]
+    before = client.get(
+        f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers
+    ).json()["count"]
+
+    r = client.post(url, headers=normal_user_token_headers, json=rows)
+    assert r.status_code == 422
+    assert [error["index"] for error in r.json()["detail"]] == [1, 2]
+    assert r.json()["detail"][0]["errors"][0]["loc"] == ["title"]
+
+    r = client.post(
+        url, headers=normal_user_token_headers, json=rows, params={"partial": True}
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["count"] == 2
+    assert [error["index"] for error in content["errors"]] == [1, 2]
+    after = client.get(
+        f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers
+    ).json()["count"]
+    assert after == before + 2
+
+
+@pytest.mark.api
+def test_create_items_bulk_too_many_rows(
+    client: TestClient, normal_user_token_headers: dict[str, str], monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "ITEMS_BULK_MAX_ROWS", 2)
+    r = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[{"title": "x"}] * 3,
+    )
+    assert r.status_code == 413
+
+
+@pytest.mark.api
+def test_export_items(client: TestClient, db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    for i in range(3):
+        crud.create_item(
+            session=db,
+            item_create=ItemCreate(title=f"export {i}", description="a, b"),
+            owner_id=user.id,
+        )
+    create_random_item(db)  # owned by someone else
+    headers = user_authentication_headers(client=client, email=email, password=password)
+    url = f"{settings.API_V1_STR}/items/export"
+
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["title"] for row in rows] == ["export 0", "export 1", "export 2"]
+    assert {row["owner_id"] for row in rows} == {str(user.id)}
+
+    r = client.get(url, headers=headers, params={"format": "csv"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    records = list(csv.DictReader(io.StringIO(r.text)))
+    assert [record["title"] for record in records] == [row["title"] for row in rows]
+    assert records[0]["description"] == "a, b"
+
+
 @pytest.mark.api
 def test_update_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
@@ -1,7 +1,18 @@
+import asyncio
+from collections import Counter
+from unittest.mock import patch
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
+from sqlmodel import Session, select
 
+from app import crud
 from app.core.config import settings
+from app.core.throttle import LoginThrottle, MemoryThrottleStore
+from app.main import app
+from app.models import OUTBOX_PENDING, EmailOutbox
+from tests.utils.user import create_random_user
 
 
 @pytest.mark.api
@@ -27,6 +38,66 @@ def test_get_access_token_incorrect_password(client: TestClient) -> None:
     assert r.status_code == 400
 
 
+@pytest.mark.api
+def test_login_throttled_after_repeated_failures(
+    client: TestClient, db: Session
+) -> None:
+    user = create_random_user(db)
+    login_data = {"username": user.email, "password": "incorrect_password"}
+    for _ in range(settings.LOGIN_THROTTLE_MAX_PER_EMAIL):
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+        assert r.status_code == 400
+
+    # Rejected before looking the user up, even with any password
+    with patch.object(crud, "authenticate_user_async") as authenticate:
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    assert r.status_code == 429
+    assert 0 < int(r.headers["Retry-After"]) <= settings.LOGIN_THROTTLE_WINDOW_SECONDS
+    authenticate.assert_not_called()
+
+
+@pytest.mark.api
+def test_login_throttle_holds_under_concurrent_failures(client: TestClient) -> None:
+    limit = 3
+    throttle = LoginThrottle(
+        MemoryThrottleStore(maxsize=100),
+        window=60.0,
+        max_per_email=limit,
+        max_per_ip=100,
+    )
+    calls = 0
+
+    async def authenticate_user_async(*_args, **_kwargs) -> None:
+        nonlocal calls
+        calls += 1
+        # Hold every request inside the credential check at once
+        await asyncio.sleep(0.05)
+        return None
+
+    async def burst() -> list[int]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            responses = await asyncio.gather(
+                *(
+                    ac.post(
+                        f"{settings.API_V1_STR}/login/access-token",
+                        data={"username": "burst@example.com", "password": "wrong"},
+                    )
+                    for _ in range(limit * 3)
+                )
+            )
+        return [r.status_code for r in responses]
+
+    with (
+        patch("app.api.routes.login.login_throttle", throttle),
+        patch.object(crud, "authenticate_user_async", authenticate_user_async),
+    ):
+        statuses = client.portal.call(burst)
+
+    assert calls == limit
+    assert Counter(statuses) == {400: limit, 429: limit * 2}
+
+
 @pytest.mark.api
 def test_recovery_password_user_not_exists(
     client: TestClient,
@@ -36,3 +107,19 @@ def test_recovery_password_user_not_exists(
         f"{settings.API_V1_STR}/login/password-recovery/{email}",
     )
     assert r.status_code == 404
+
+
+@pytest.mark.api
+def test_recovery_password_writes_outbox(
+    client: TestClient, db: Session, monkeypatch
+) -> None:
+    user = create_random_user(db)
+    monkeypatch.setattr(settings, "SMTP_HOST", "smtp.example.com")
+    monkeypatch.setattr(settings, "EMAILS_FROM_EMAIL", "noreply@example.com")
+    with patch("app.api.routes.login.outbox_dispatcher") as dispatcher:
+        r = client.post(f"{settings.API_V1_STR}/login/password-recovery/{user.email}")
+    assert r.status_code == 200
+    dispatcher.wake.assert_called_once()
+    [email] = db.exec(select(EmailOutbox).where(EmailOutbox.email_to == user.email))
+    assert email.status == OUTBOX_PENDING
+    assert "/new-password?token=" in email.html_content
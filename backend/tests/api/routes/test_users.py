@@ -1,6 +1,9 @@
+import json
+import time
 import uuid
 from unittest.mock import patch
 
+import jwt
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
@@ -8,8 +11,9 @@ from sqlmodel import Session, select
 from app import crud
 from app.core.config import settings
 from app.core.security import verify_password
-from app.models import User
-from app.schemas import UserCreate
+from app.models import OUTBOX_PENDING, EmailOutbox, User
+from app.schemas import UserCreate, UserUpdate
+from tests.utils.user import user_authentication_headers
 from tests.utils.utils import random_email, random_lower_string
 
 
@@ -25,6 +29,21 @@ def test_get_users_superuser_me(
     assert current_user["email"] == settings.FIRST_SUPERUSER
 
 
+@pytest.mark.api
+def test_get_users_me_conditional(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/users/me"
+    etag = client.get(url, headers=normal_user_token_headers).headers["ETag"]
+    conditional = {**normal_user_token_headers, "If-None-Match": f'"x", W/{etag}'}
+    assert client.get(url, headers=conditional).status_code == 304
+
+    client.patch(url, headers=normal_user_token_headers, json={"full_name": "New"})
+    r = client.get(url, headers=conditional)
+    assert r.status_code == 200
+    assert r.json()["full_name"] == "New"
+
+
 @pytest.mark.api
 def test_get_users_normal_user_me(
     client: TestClient, normal_user_token_headers: dict[str, str]
@@ -42,9 +61,10 @@ def test_create_user_new_email(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     with (
-        patch("app.utils.send_email", return_value=None),
         patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
         patch("app.core.config.settings.SMTP_USER", "admin@example.com"),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+        patch("app.api.routes.users.outbox_dispatcher") as dispatcher,
     ):
         username = random_email()
         password = random_lower_string()
@@ -59,6 +79,11 @@ def test_create_user_new_email(
         user = crud.get_user_by_email(session=db, email=username)
         assert user
         assert user.email == created_user["email"]
+        # The welcome email was committed with the user
+        [email] = db.exec(select(EmailOutbox).where(EmailOutbox.email_to == username))
+        assert email.status == OUTBOX_PENDING
+        assert password not in email.html_content
+        dispatcher.wake.assert_called_once()
 
 
 @pytest.mark.api
@@ -511,3 +536,109 @@ def test_delete_user_without_privileges(
     )
     assert r.status_code == 403
     assert r.json()["detail"] == "The user doesn't have enough privileges"
+
+
+@pytest.mark.api
+def test_current_user_cache_invalidated_on_update(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    username = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=username, password=password)
+    )
+    headers = user_authentication_headers(
+        client=client, email=username, password=password
+    )
+
+    hits = crud.principal_cache.hits
+    for _ in range(2):
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        assert r.status_code == 200
+    assert crud.principal_cache.hits == hits + 1
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/me",
+        headers=headers,
+        json={"full_name": "Cached Name"},
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.json()["full_name"] == "Cached Name"
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/{user.id}",
+        headers=superuser_token_headers,
+        json={"is_active": False},
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Inactive user"
+
+    r = client.delete(
+        f"{settings.API_V1_STR}/users/{user.id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 404
+
+
+@pytest.mark.api
+def test_current_user_cache_is_stale_for_at_most_the_ttl(
+    client: TestClient, db: Session, monkeypatch
+) -> None:
+    monkeypatch.setattr(crud.principal_cache, "ttl", 0.2)
+    username = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=username, password=password)
+    )
+    headers = user_authentication_headers(
+        client=client, email=username, password=password
+    )
+    url = f"{settings.API_V1_STR}/users/me"
+    assert client.get(url, headers=headers).status_code == 200
+    cached = crud.principal_cache.get(username)
+    assert cached is not None
+
+    # Deactivated on another worker, which only invalidates its own cache
+    crud.update_user(session=db, user_in=UserUpdate(is_active=False), db_user=user)
+    crud.principal_cache.set(username, cached)
+    assert client.get(url, headers=headers).status_code == 200
+
+    time.sleep(0.25)
+    r = client.get(url, headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Inactive user"
+
+
+@pytest.mark.api
+def test_token_without_subject_is_rejected(client: TestClient) -> None:
+    token = jwt.encode({"exp": time.time() + 60}, settings.SECRET_KEY, "HS256")
+    r = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 403
+    assert r.json()["detail"] == "Could not validate credentials"
+
+
+@pytest.mark.api
+def test_export_users(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    url = f"{settings.API_V1_STR}/users/export"
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert settings.FIRST_SUPERUSER in {row["email"] for row in rows}
+    assert all("hashed_password" not in row for row in rows)
+
+    r = client.get(url, headers=superuser_token_headers, params={"format": "csv"})
+    assert r.text.splitlines()[0] == "email,is_active,is_superuser,full_name,id"
+
+    r = client.get(url, headers=normal_user_token_headers)
+    assert r.status_code == 403
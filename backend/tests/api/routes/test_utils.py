@@ -0,0 +1,61 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+@pytest.mark.api
+def test_db_pool_superuser(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    content = r.json()
+    for engine_name in ("async", "sync"):
+        pool = content[engine_name]
+        assert pool["size"] == settings.DB_POOL_SIZE
+        assert pool["max_overflow"] == settings.DB_MAX_OVERFLOW
+        for key in ("checked_out", "overflow", "timeouts", "wait_time_max_ms"):
+            assert key in pool
+
+
+@pytest.mark.api
+def test_db_pool_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+
+
+@pytest.mark.api
+def test_caches_superuser(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/caches/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    content = r.json()
+    for cache in ("principals", "totals"):
+        for key in ("size", "hits", "misses", "hit_ratio"):
+            assert key in content[cache]
+    assert content["principals"]["hits"] + content["principals"]["misses"] > 0
+
+
+@pytest.mark.api
+def test_password_hashes_superuser(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/password-hashes/",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["service"]["rounds"] >= 10
+    assert sum(row["count"] for row in content["hashes"]) >= 1
+    assert all(row["scheme"] == "bcrypt" for row in content["hashes"])
@@ -0,0 +1,116 @@
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import Engine, event
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.models import User
+from app.schemas import ItemCreate
+from tests.utils.test_db import test_async_engine
+from tests.utils.user import create_random_user
+
+
+@contextmanager
+def count_statements(
+    engine: Engine = test_async_engine.sync_engine,
+) -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.crud
+@pytest.mark.asyncio
+async def test_items_page_fetches_rows_and_total_in_one_statement(
+    db: Session, async_db: AsyncSession
+) -> None:
+    owner = create_random_user(db)
+    for i in range(3):
+        crud.create_item(
+            session=db, item_create=ItemCreate(title=f"item {i}"), owner_id=owner.id
+        )
+
+    with count_statements() as statements:
+        page = await crud.get_items_page_async(async_db, owner_id=owner.id, limit=2)
+    assert len(statements) == 1
+    assert len(page.rows) == 2
+    assert page.total == crud.Total(3)
+
+    # The total is cached now, so the next page is a plain select
+    with count_statements() as statements:
+        page = await crud.get_items_page_async(
+            async_db, owner_id=owner.id, skip=2, limit=2
+        )
+    assert len(statements) == 1
+    assert "count" not in statements[0].lower()
+    assert len(page.rows) == 1
+    assert page.total.count == 3
+
+
+@pytest.mark.crud
+@pytest.mark.asyncio
+async def test_items_page_past_the_end_still_reports_total(
+    db: Session, async_db: AsyncSession
+) -> None:
+    owner = create_random_user(db)
+    crud.create_item(session=db, item_create=ItemCreate(title="x"), owner_id=owner.id)
+
+    page = await crud.get_items_page_async(async_db, owner_id=owner.id, skip=10)
+    assert page.rows == []
+    assert page.total.count == 1
+
+
+@pytest.mark.crud
+@pytest.mark.asyncio
+async def test_create_items_bulk_uses_one_insert(
+    db: Session, async_db: AsyncSession
+) -> None:
+    owner = create_random_user(db)
+    items = [ItemCreate(title=f"item {i}") for i in range(50)]
+
+    with count_statements() as statements:
+        ids = await crud.create_items_bulk_async(async_db, items, owner_id=owner.id)
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 1
+    assert "RETURNING" in inserts[0].upper()
+    assert len(set(ids)) == 50
+
+    page = await crud.get_items_page_async(async_db, owner_id=owner.id, limit=100)
+    assert [item.id for item in page.rows] == ids
+
+
+@pytest.mark.crud
+@pytest.mark.asyncio
+async def test_create_items_bulk_copies_large_batches(
+    postgres_db: AsyncSession, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "ITEMS_BULK_COPY_MIN_ROWS", 10)
+    owner = User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="x")
+    postgres_db.add(owner)
+    await postgres_db.commit()
+    items = [ItemCreate(title=f"item {i}", description="d") for i in range(10)]
+
+    with count_statements(postgres_db.bind.sync_engine) as statements:
+        ids = await crud.create_items_bulk_async(postgres_db, items, owner.id)
+    try:
+        # Loaded with COPY, not INSERT
+        assert not any(s.lstrip().upper().startswith("INSERT") for s in statements)
+        assert len(set(ids)) == 10
+        page = await crud.get_items_page_async(postgres_db, owner_id=owner.id)
+        assert [item.id for item in page.rows] == ids
+        assert all(item.description == "d" for item in page.rows)
+    finally:
+        await postgres_db.delete(owner)
+        await postgres_db.commit()
@@ -0,0 +1,97 @@
+"""Check with EXPLAIN that the hot queries are served by their indexes."""
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.models import UserCreate
+from app.schemas import ItemCreate
+from tests.utils.test_db import capture_selects, test_async_engine, test_engine
+from tests.utils.user import create_random_user
+from tests.utils.utils import random_lower_string
+
+
+def query_plan(db: Session, statement: str, parameters: tuple) -> str:
+    rows = db.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement}", parameters
+    )
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.mark.crud
+@pytest.mark.asyncio
+async def test_owner_items_page_uses_owner_index(
+    db: Session, async_db: AsyncSession
+) -> None:
+    owner = create_random_user(db)
+    crud.create_item(session=db, item_create=ItemCreate(title="x"), owner_id=owner.id)
+
+    with capture_selects(test_async_engine.sync_engine) as statements:
+        await crud.get_items_page_async(async_db, owner_id=owner.id, limit=10)
+    [(statement, parameters)] = statements
+    plan = query_plan(db, statement, parameters)
+    # The page walks the keyset index; the count subquery may use any
+    # (owner_id, ...) index
+    assert "ix_item_owner_id_created_at_id (owner_id=?)" in plan
+    assert plan.count("(owner_id=?)") == 2
+    assert "SCAN item" not in plan
+
+
+@pytest.mark.crud
+def test_cascade_delete_loads_items_through_owner_index(db: Session) -> None:
+    owner = create_random_user(db)
+    crud.create_item(session=db, item_create=ItemCreate(title="x"), owner_id=owner.id)
+
+    with capture_selects(test_engine) as statements:
+        db.delete(owner)
+        db.flush()
+    plans = [query_plan(db, *s) for s in statements if "FROM item" in s[0]]
+    assert plans
+    assert all("SEARCH item USING" in plan for plan in plans)
+    assert all("(owner_id=?)" in plan for plan in plans)
+    db.rollback()
+
+
+@pytest.mark.crud
+@pytest.mark.parametrize(
+    "query, index",
+    [
+        (crud.get_superusers, "ix_user_is_superuser_partial"),
+        (crud.get_active_users, "ix_user_is_active_partial"),
+    ],
+)
+def test_flag_filters_use_partial_indexes(db: Session, query, index: str) -> None:
+    with capture_selects(test_engine) as statements:
+        query(session=db)
+    [(statement, parameters)] = statements
+    assert index in query_plan(db, statement, parameters)
+
+
+@pytest.mark.crud
+@pytest.mark.asyncio
+async def test_email_lookup_ignores_case_and_uses_index(
+    db: Session, async_db: AsyncSession
+) -> None:
+    email = f"{random_lower_string()}@example.com"
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password="changethis")
+    )
+
+    with capture_selects(test_engine) as statements:
+        found = crud.get_user_by_email(session=db, email=email.upper())
+    assert found is not None and found.id == user.id
+    with capture_selects(test_async_engine.sync_engine) as async_statements:
+        found = await crud.get_user_by_email_async(async_db, email.title())
+    assert found is not None and found.id == user.id
+
+    for statement, parameters in [*statements, *async_statements]:
+        assert "uq_user_email_lower" in query_plan(db, statement, parameters)
+
+    with pytest.raises(IntegrityError):
+        crud.create_user(
+            session=db,
+            user_create=UserCreate(email=email.upper(), password="changethis"),
+        )
+    db.rollback()
@@ -0,0 +1,89 @@
+import pytest
+from passlib.hash import bcrypt, sha256_crypt
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.core.passwords import password_service
+from app.core.security import needs_update, scheme_and_cost, verify_password
+from app.schemas import UserCreate, UserUpdate
+from tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.mark.crud
+@pytest.mark.asyncio
+async def test_create_user_async(async_db: AsyncSession) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password)
+    user = await crud.create_user_async(session=async_db, user_create=user_in)
+    assert user.email == email
+    assert verify_password(password, user.hashed_password)
+
+
+@pytest.mark.crud
+@pytest.mark.asyncio
+async def test_authenticate_user_async(async_db: AsyncSession) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password)
+    user = await crud.create_user_async(session=async_db, user_create=user_in)
+    authenticated_user = await crud.authenticate_user_async(
+        session=async_db, email=email, password=password
+    )
+    assert authenticated_user
+    assert user.email == authenticated_user.email
+    assert not await crud.authenticate_user_async(
+        session=async_db, email=email, password=random_lower_string()
+    )
+
+
+@pytest.mark.crud
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "legacy_hash",
+    [
+        lambda password: bcrypt.using(rounds=4).hash(password),
+        lambda password: sha256_crypt.using(rounds=1000).hash(password),
+    ],
+)
+async def test_authenticate_user_async_upgrades_outdated_hash(
+    async_db: AsyncSession, legacy_hash
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = await crud.create_user_async(
+        session=async_db, user_create=UserCreate(email=email, password=password)
+    )
+    user.hashed_password = legacy_hash(password)
+    async_db.add(user)
+    await async_db.commit()
+    assert needs_update(user.hashed_password)
+
+    authenticated_user = await crud.authenticate_user_async(
+        session=async_db, email=email, password=password
+    )
+    assert authenticated_user
+    await async_db.refresh(authenticated_user)
+    assert not needs_update(authenticated_user.hashed_password)
+    assert scheme_and_cost(authenticated_user.hashed_password) == (
+        "bcrypt",
+        password_service.rounds,
+    )
+    assert verify_password(password, authenticated_user.hashed_password)
+
+
+@pytest.mark.crud
+@pytest.mark.asyncio
+async def test_update_and_delete_user_async(async_db: AsyncSession) -> None:
+    user_in = UserCreate(email=random_email(), password=random_lower_string())
+    user = await crud.create_user_async(session=async_db, user_create=user_in)
+    new_password = random_lower_string()
+    await crud.update_user_async(
+        session=async_db, db_user=user, user_in=UserUpdate(password=new_password)
+    )
+    user_2 = await crud.get_user_async(session=async_db, user_id=user.id)
+    assert user_2
+    assert verify_password(new_password, user_2.hashed_password)
+
+    await crud.delete_user_async(session=async_db, user_id=user.id)
+    assert await crud.get_user_async(session=async_db, user_id=user.id) is None
@@ -0,0 +1,38 @@
+import time
+
+import pytest
+
+from app.core.cache import TTLCache
+
+
+@pytest.mark.unit
+def test_ttl_cache_hits_misses_and_expiry():
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    cache.set("b", 2, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("b") is None
+    assert len(cache) == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+@pytest.mark.unit
+def test_ttl_cache_evicts_least_recently_used():
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    cache.pop("a")
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import exc as sa_exc
+
+from app.db.pool import InstrumentedQueuePool, instrument_pool, pool_status
+
+
+@pytest.mark.unit
+def test_pool_status_counts_checkouts_and_timeouts(tmp_path):
+    """A saturated pool reports the checked-out gauge and the timeout."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    instrument_pool(engine.pool)
+
+    with engine.connect():
+        status = pool_status(engine.pool)
+        assert status["checked_out"] == 1
+        with pytest.raises(sa_exc.TimeoutError):
+            engine.connect()
+
+    status = pool_status(engine.pool)
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 1
+    assert status["checkins"] == 1
+    assert status["connects"] == 1
+    assert status["timeouts"] == 1
+    assert status["wait_time_max_ms"] >= 50
+
+    engine.dispose()
+    assert pool_status(engine.pool)["timeouts"] == 1
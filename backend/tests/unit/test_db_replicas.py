@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import select
+
+from app.db import session as db_session
+from app.db.replicas import ReplicaSet
+from app.models import User
+
+
+def make_replica_set(*engines, window: float = 10.0) -> ReplicaSet:
+    return ReplicaSet(
+        list(engines),
+        max_lag=5.0,
+        check_interval=5.0,
+        check_timeout=1.0,
+        read_your_writes_window=window,
+    )
+
+
+@pytest.mark.unit
+def test_choose_round_robin_skips_ejected_replicas():
+    engines = [
+        create_async_engine(f"sqlite+aiosqlite:///replica{i}.db", poolclass=NullPool)
+        for i in range(2)
+    ]
+    replicas = make_replica_set(*engines)
+
+    assert {replicas.choose(), replicas.choose()} == set(engines)
+
+    replicas.eject(replicas.replicas[0], "down")
+    assert [replicas.choose() for _ in range(3)] == [engines[1]] * 3
+
+    replicas.eject(replicas.replicas[1], "down")
+    assert replicas.choose() is None
+
+
+@pytest.mark.unit
+def test_read_your_writes_window():
+    replicas = make_replica_set(window=10.0)
+    assert not replicas.wrote_recently("client")
+    replicas.record_write("client")
+    assert replicas.wrote_recently("client")
+    assert not replicas.wrote_recently("other-client")
+
+    expired = make_replica_set(window=0.0)
+    expired.record_write("client")
+    assert not expired.wrote_recently("client")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_health_check_ejects_replica(tmp_path):
+    # SQLite has no replication functions, so the lag probe fails
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool
+    )
+    replicas = make_replica_set(engine)
+    await replicas.check_all()
+    status = replicas.status()[0]
+    assert status["healthy"] is False
+    assert "health check failed" in status["last_error"]
+    assert replicas.choose() is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_routing_session_sends_reads_to_replica_and_writes_to_primary(
+    monkeypatch, tmp_path
+):
+    primary = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}", poolclass=NullPool
+    )
+    replica = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool
+    )
+    monkeypatch.setattr(db_session, "async_engine", primary)
+    monkeypatch.setattr(db_session, "replica_set", make_replica_set(replica))
+
+    sync_session = db_session.RoutingSession(info={"read_only": True})
+    statement = select(User)
+    assert sync_session.get_bind(clause=statement) is replica.sync_engine
+    assert sync_session.get_bind(clause=statement.with_for_update()) is (
+        primary.sync_engine
+    )
+    # Once the session wrote, its reads follow to the primary
+    assert sync_session.get_bind(clause=statement) is primary.sync_engine
+
+    writable = db_session.RoutingSession(info={"read_only": False})
+    assert writable.get_bind(clause=statement) is primary.sync_engine
+
+
+@pytest.mark.unit
+def test_routing_session_keeps_one_replica(monkeypatch):
+    engines = [
+        create_async_engine("sqlite+aiosqlite://", poolclass=NullPool) for _ in range(2)
+    ]
+    monkeypatch.setattr(db_session, "replica_set", make_replica_set(*engines))
+
+    statement = select(User)
+    first = db_session.RoutingSession(info={"read_only": True})
+    binds = {first.get_bind(clause=statement) for _ in range(4)}
+    assert len(binds) == 1
+    # The next session moves on to the other replica
+    second = db_session.RoutingSession(info={"read_only": True})
+    assert second.get_bind(clause=statement) not in binds
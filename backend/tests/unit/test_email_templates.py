@@ -0,0 +1,42 @@
+import pytest
+
+from app.core.config import settings
+from app.core.email_templates import EmailTemplateError, EmailTemplates
+from app.utils import NEW_ACCOUNT_TEMPLATE, RESET_PASSWORD_TEMPLATE
+
+
+@pytest.mark.unit
+def test_build_templates_cover_the_required_ones():
+    templates = EmailTemplates(settings.EMAIL_TEMPLATES_DIR / "build")
+    templates.require(NEW_ACCOUNT_TEMPLATE)
+    templates.require(RESET_PASSWORD_TEMPLATE)
+    templates.load()
+    assert {NEW_ACCOUNT_TEMPLATE, RESET_PASSWORD_TEMPLATE} <= set(templates.names)
+
+
+@pytest.mark.unit
+def test_missing_required_template_fails_load(tmp_path):
+    (tmp_path / "present.html").write_text("<p>{{ name }}</p>")
+    templates = EmailTemplates(tmp_path)
+    templates.require("present.html")
+    templates.require("recovery.html")
+    with pytest.raises(EmailTemplateError, match="recovery.html"):
+        templates.load()
+
+
+@pytest.mark.unit
+def test_templates_are_compiled_once_and_escaped(tmp_path):
+    (tmp_path / "hello.html").write_text("<p>Hello {{ name }}</p>")
+    (tmp_path / "static.html").write_text("<p>Always the same</p>")
+    templates = EmailTemplates(tmp_path)
+    templates.load()
+    # Later edits on disk are not picked up
+    (tmp_path / "hello.html").write_text("changed")
+    (tmp_path / "static.html").write_text("changed")
+
+    assert templates.render("hello.html", name="<b>") == "<p>Hello &lt;b&gt;</p>"
+    assert templates.render("static.html") == "<p>Always the same</p>"
+    with pytest.raises(EmailTemplateError):
+        templates.render("unknown.html")
+    with pytest.raises(EmailTemplateError):
+        templates.require("unknown.html")
@@ -0,0 +1,37 @@
+import pytest
+from passlib.hash import bcrypt, sha256_crypt
+
+from app.core import hashing
+
+
+@pytest.mark.unit
+def test_calibrate_rounds_stays_within_bounds():
+    assert hashing.calibrate_rounds(target_ms=0) == hashing.MIN_ROUNDS
+    assert hashing.calibrate_rounds(target_ms=1e9) == hashing.MAX_ROUNDS
+    assert hashing.calibrate_rounds(target_ms=0, min_rounds=4) == 4
+
+
+@pytest.mark.unit
+def test_scheme_and_cost():
+    assert hashing.scheme_and_cost(bcrypt.using(rounds=5).hash("x")) == ("bcrypt", 5)
+    assert hashing.scheme_and_cost("$2b$12$") == ("bcrypt", 12)
+    assert hashing.scheme_and_cost(sha256_crypt.hash("x")) == ("sha256_crypt", None)
+    assert hashing.scheme_and_cost("plain") == ("unknown", None)
+
+
+@pytest.mark.unit
+def test_new_hashes_use_bcrypt():
+    assert hashing.scheme_and_cost(hashing.get_password_hash("x"))[0] == "bcrypt"
+    assert hashing.needs_update(sha256_crypt.hash("x"))
+
+
+@pytest.mark.unit
+def test_hashes_of_another_cost_need_update():
+    saved = hashing.pwd_context.to_dict()
+    try:
+        hashing.configure(5)
+        assert not hashing.needs_update(bcrypt.using(rounds=5).hash("x"))
+        assert hashing.needs_update(bcrypt.using(rounds=4).hash("x"))
+        assert hashing.needs_update(bcrypt.using(rounds=6).hash("x"))
+    finally:
+        hashing.pwd_context.load(saved)
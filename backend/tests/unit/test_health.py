@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+import psutil
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.api.routes import utils
+from app.core import health
+from app.core.config import settings
+from app.core.health import DependencyRegistry, SystemSampler, system_sampler
+
+
+@pytest.mark.unit
+def test_snapshot_reports_age_and_staleness():
+    sampler = SystemSampler(interval=1.0)
+    assert sampler.snapshot()["status"] == "unknown"
+
+    sample = sampler.sample()
+    snapshot = sampler.snapshot()
+    assert snapshot["status"] in ("healthy", "degraded")
+    assert snapshot["cpu_usage_percent"] == sample["cpu_usage_percent"]
+    assert 0 <= snapshot["age_s"] < 1
+
+    sample["sampled_at"] = time.time() - 10
+    assert sampler.snapshot()["status"] == "stale"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_monitor_samples_in_background():
+    sampler = SystemSampler(interval=0.01)
+    task = asyncio.create_task(sampler.monitor())
+    try:
+        await asyncio.sleep(0.1)
+        first = sampler.snapshot()["sampled_at"]
+        await asyncio.sleep(0.1)
+        assert sampler.snapshot()["sampled_at"] > first
+    finally:
+        task.cancel()
+
+
+@pytest.mark.unit
+def test_health_serves_cached_snapshot(client: TestClient, monkeypatch):
+    system_sampler.sample()
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("psutil called while serving /health")
+
+    monkeypatch.setattr(psutil, "cpu_percent", fail)
+    monkeypatch.setattr(psutil, "virtual_memory", fail)
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert "age_s" in response.json()["system"]
+
+
+@pytest.mark.unit
+def test_lifespan_waits_for_background_tasks(monkeypatch):
+    finished = []
+
+    async def monitor() -> None:
+        try:
+            await asyncio.Event().wait()
+        finally:
+            # Cleanup that needs the loop, like closing a connection
+            await asyncio.sleep(0.01)
+            finished.append(True)
+
+    monkeypatch.setattr(system_sampler, "monitor", monitor)
+    with TestClient(main.app):
+        assert not finished
+    assert finished == [True]
+
+
+async def ok() -> None:
+    pass
+
+
+async def broken() -> None:
+    raise ConnectionRefusedError("down")
+
+
+async def hangs() -> None:
+    await asyncio.sleep(10)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_registry_bounds_probes_and_keeps_results():
+    registry = DependencyRegistry(interval=1.0, timeout=0.05)
+    registry.register("database", ok)
+    registry.register("cache", hangs)
+    registry.register("mail", broken, critical=False)
+    assert not registry.ready
+
+    start = time.perf_counter()
+    await registry.check_all()
+    assert time.perf_counter() - start < 1
+
+    status = registry.status()
+    assert status["database"]["healthy"] is True
+    assert status["cache"]["healthy"] is False
+    assert "TimeoutError" in status["cache"]["last_error"]
+    assert status["cache"]["latency_ms"] >= 50
+    assert "down" in status["mail"]["last_error"]
+    assert not registry.ready
+
+    registry.dependencies["cache"].probe = ok
+    await registry.check_all()
+    # Only critical dependencies decide readiness
+    assert registry.ready
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_smtp_probe_expects_greeting(monkeypatch):
+    async def greet(reader, writer):
+        writer.write(b"220 localhost ESMTP\r\n")
+        await writer.drain()
+        await reader.readline()
+        writer.close()
+
+    server = await asyncio.start_server(greet, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", port)
+    monkeypatch.setattr(settings, "SMTP_SSL", False)
+    async with server:
+        await health.check_smtp()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("probe, code", [(ok, 200), (broken, 503)])
+async def test_readiness_answers_from_latest_probe(
+    client: TestClient, monkeypatch, probe, code
+):
+    registry = DependencyRegistry(interval=1.0, timeout=1.0)
+    registry.register("database", probe)
+    await registry.check_all()
+    monkeypatch.setattr(main, "dependency_registry", registry)
+    monkeypatch.setattr(utils, "dependency_registry", registry)
+
+    response = client.get("/health/readiness")
+    assert response.status_code == code
+    assert "latency_ms" in response.json()["dependencies"]["database"]
+
+    response = client.get(f"{settings.API_V1_STR}/utils/health-check/")
+    assert response.json()["status"] == ("healthy" if code == 200 else "unhealthy")
@@ -0,0 +1,96 @@
+import json
+import logging
+import queue
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.log import (
+    DroppingQueueHandler,
+    JSONFormatter,
+    LogWriter,
+    RequestLoggingMiddleware,
+)
+
+
+def make_app(**options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware, **options)
+
+    @app.get("/ok")
+    async def ok() -> dict[str, bool]:
+        return {"ok": True}
+
+    @app.get("/missing")
+    async def missing() -> None:
+        raise HTTPException(status_code=404)
+
+    return app
+
+
+def access_records(caplog) -> list[logging.LogRecord]:
+    return [r for r in caplog.records if r.name == "app.access"]
+
+
+@pytest.mark.unit
+def test_json_formatter_merges_fields():
+    record = logging.LogRecord("app", logging.INFO, __file__, 1, "hi %s", ("x",), None)
+    record.fields = {"status": 200}
+    data = json.loads(JSONFormatter().format(record))
+    assert data.pop("time")
+    assert data == {
+        "level": "INFO",
+        "logger": "app",
+        "message": "hi x",
+        "status": 200,
+    }
+
+
+@pytest.mark.unit
+def test_queue_handler_drops_when_full():
+    handler = DroppingQueueHandler(queue.Queue(1))
+    record = logging.LogRecord("app", logging.INFO, __file__, 1, "msg", None, None)
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+@pytest.mark.unit
+def test_log_writer_writes_json_lines(capsys):
+    writer = LogWriter(level="INFO")
+    writer.start()
+    try:
+        logging.getLogger("app.test").info("hello", extra={"fields": {"a": 1}})
+    finally:
+        writer.stop()
+    [line] = capsys.readouterr().out.splitlines()
+    assert json.loads(line)["message"] == "hello"
+    assert json.loads(line)["a"] == 1
+
+
+@pytest.mark.unit
+def test_middleware_samples_successes_but_keeps_errors(caplog):
+    caplog.set_level(logging.INFO, logger="app.access")
+    client = TestClient(make_app(sample_rate=0.0, slow_ms=60_000))
+    client.get("/ok")
+    client.get("/missing?q=1")
+    [record] = access_records(caplog)
+    assert record.levelno == logging.WARNING
+    assert record.fields["method"] == "GET"
+    assert record.fields["path"] == "/missing"
+    assert record.fields["query"] == "q=1"
+    assert record.fields["status"] == 404
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("options", [{"sample_rate": 1.0}, {"slow_ms": 0.0}])
+def test_middleware_logs_sampled_and_slow_requests(caplog, options):
+    caplog.set_level(logging.INFO, logger="app.access")
+    client = TestClient(make_app(**{"sample_rate": 0.0, **options}))
+    client.get("/ok")
+    [record] = access_records(caplog)
+    assert record.levelno == logging.INFO
+    assert record.fields["status"] == 200
+    assert record.fields["duration_ms"] >= 0
@@ -0,0 +1,94 @@
+import asyncio
+from email import message_from_bytes
+
+import emails
+import pytest
+
+from app.core.config import settings
+from app.core.email_templates import email_templates
+from app.core.mail import Mailer, SMTPPool
+from app.utils import NEW_ACCOUNT_TEMPLATE, build_email
+from tests.utils.smtp import free_port
+
+
+def message(n: int) -> emails.Message:
+    return emails.Message(
+        subject=f"Message {n}",
+        html=f"<p>{n}</p>",
+        mail_from=("Test", "sender@example.com"),
+        mail_to=f"user{n}@example.com",
+    )
+
+
+@pytest.mark.unit
+def test_pool_sends_batches_over_one_session(smtp_sink):
+    sink, port = smtp_sink
+    pool = SMTPPool(2, host="127.0.0.1", port=port)
+    try:
+        first = pool.send_batch([message(n) for n in range(3)])
+        second = pool.send_batch([message(n) for n in range(3, 5)])
+    finally:
+        pool.close()
+
+    assert all(response.success for response in first + second)
+    assert [rcpt for _, rcpt, _ in sink.messages] == [
+        f"user{n}@example.com" for n in range(5)
+    ]
+    # The session is kept open and reused by the next batch
+    assert len(sink.sessions) == 1
+    assert pool.stats() == {"size": 2, "idle": 0, "sent": 5, "failed": 0}
+
+
+@pytest.mark.unit
+def test_pool_reports_unreachable_server():
+    pool = SMTPPool(1, host="127.0.0.1", port=free_port(), timeout=1)
+    [response] = pool.send_batch([message(0)])
+    assert not response.success
+    assert pool.stats()["failed"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_mailer_queues_and_batches(smtp_sink):
+    sink, port = smtp_sink
+    mailer = Mailer(SMTPPool(2, host="127.0.0.1", port=port), batch_size=10)
+    futures = [mailer.submit(message(n)) for n in range(20)]
+    # submit() returns before anything is sent
+    assert not sink.messages
+
+    responses = await asyncio.gather(*futures)
+    await mailer.stop()
+    assert all(response.success for response in responses)
+    assert len(sink.messages) == 20
+    assert len(sink.sessions) <= 2
+
+
+@pytest.mark.unit
+def test_rendered_html_is_sent_verbatim(smtp_sink, monkeypatch):
+    sink, port = smtp_sink
+    monkeypatch.setattr(settings, "EMAILS_FROM_EMAIL", "noreply@example.com")
+    username = "pw{{ 7*7 }}xx{% if x %}"
+    html_content = email_templates.render(
+        NEW_ACCOUNT_TEMPLATE,
+        project_name=settings.PROJECT_NAME,
+        username=username,
+        link=settings.SERVER_HOST,
+    )
+    pool = SMTPPool(1, host="127.0.0.1", port=port)
+    try:
+        [response] = pool.send_batch(
+            [build_email("user@example.com", "Welcome", html_content)]
+        )
+    finally:
+        pool.close()
+
+    assert response.success
+    [(_, _, content)] = sink.messages
+    body = next(
+        part.get_payload(decode=True).decode()
+        for part in message_from_bytes(content).walk()
+        if part.get_content_type() == "text/html"
+    )
+    # User values are not evaluated as Jinja a second time
+    assert username in body
+    assert "pw49xx" not in body
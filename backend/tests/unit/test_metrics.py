@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.metrics import UNMATCHED_ROUTE, MetricsMiddleware
+from app.main import app as main_app
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/things/{thing_id}")
+    async def read_thing(thing_id: int) -> dict[str, int]:
+        return {"id": thing_id}
+
+    return app
+
+
+def requests_total(route: str, status: str) -> float:
+    labels = {"method": "GET", "route": route, "status": status}
+    return REGISTRY.get_sample_value("http_requests_total", labels) or 0.0
+
+
+@pytest.mark.unit
+def test_requests_are_labelled_by_route_template():
+    client = TestClient(make_app())
+    ok = requests_total("/things/{thing_id}", "200")
+    invalid = requests_total("/things/{thing_id}", "422")
+    unmatched = requests_total(UNMATCHED_ROUTE, "404")
+    durations = (
+        REGISTRY.get_sample_value(
+            "http_request_duration_seconds_count",
+            {"method": "GET", "route": "/things/{thing_id}"},
+        )
+        or 0.0
+    )
+
+    client.get("/things/1")
+    client.get("/things/2")
+    client.get("/things/x")
+    client.get("/nothing/here")
+
+    assert requests_total("/things/{thing_id}", "200") == ok + 2
+    assert requests_total("/things/{thing_id}", "422") == invalid + 1
+    assert requests_total(UNMATCHED_ROUTE, "404") == unmatched + 1
+    assert (
+        REGISTRY.get_sample_value(
+            "http_request_duration_seconds_count",
+            {"method": "GET", "route": "/things/{thing_id}"},
+        )
+        == durations + 3
+    )
+    assert (
+        REGISTRY.get_sample_value("http_requests_in_progress", {"method": "GET"}) == 0
+    )
+
+
+@pytest.mark.unit
+def test_metrics_endpoint_exposes_app_routes(client: TestClient):
+    client.get("/health/liveness")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_requests_total{method="GET",route="/health/liveness",status="200"}'
+        in response.text
+    )
+    assert main_app.openapi()["paths"].get("/metrics") is None
+
+
+RECORD = """
+from app.core.metrics import REQUESTS
+REQUESTS.labels("GET", "/things/{thing_id}", "200").inc(%d)
+"""
+RENDER = """
+import sys
+from app.core.metrics import render_metrics
+sys.stdout.write(render_metrics()[0].decode())
+"""
+
+
+@pytest.mark.unit
+def test_multiprocess_mode_aggregates_workers(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for count in (2, 3):
+        subprocess.run([sys.executable, "-c", RECORD % count], env=env, check=True)
+    output = subprocess.run(
+        [sys.executable, "-c", RENDER], env=env, check=True, capture_output=True
+    ).stdout.decode()
+    assert (
+        'http_requests_total{method="GET",route="/things/{thing_id}",status="200"} 5.0'
+        in output
+    )
@@ -0,0 +1,149 @@
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from prometheus_client import REGISTRY
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.core.mail import SMTPPool
+from app.core.outbox import OutboxDispatcher
+from app.models import OUTBOX_DEAD, OUTBOX_PENDING, OUTBOX_SENT, EmailOutbox
+from tests.utils.smtp import free_port
+from tests.utils.test_db import test_async_engine
+
+
+@pytest_asyncio.fixture
+async def session_factory(
+    monkeypatch,
+) -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    monkeypatch.setattr(settings, "EMAILS_FROM_EMAIL", "noreply@example.com")
+    factory = async_sessionmaker(
+        test_async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with factory() as session:
+        await session.exec(delete(EmailOutbox))  # type: ignore[call-overload]
+        await session.commit()
+    yield factory
+
+
+async def add_emails(
+    factory: async_sessionmaker[AsyncSession], count: int
+) -> list[EmailOutbox]:
+    emails = [
+        crud.outbox_email(f"user{n}@example.com", f"Message {n}", f"<p>{n}</p>")
+        for n in range(count)
+    ]
+    async with factory() as session:
+        session.add_all(emails)
+        await session.commit()
+    return emails
+
+
+async def outbox_rows(factory: async_sessionmaker[AsyncSession]) -> list[EmailOutbox]:
+    async with factory() as session:
+        result = await session.exec(select(EmailOutbox).order_by(EmailOutbox.email_to))
+        return list(result.all())
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_dispatch_sends_due_emails(session_factory, smtp_sink):
+    sink, port = smtp_sink
+    await add_emails(session_factory, 5)
+    sent_before = sample("email_outbox_attempts_total", outcome="sent")
+    batches_before = sample("email_send_duration_seconds_count")
+    dispatcher = OutboxDispatcher(
+        session_factory, SMTPPool(2, host="127.0.0.1", port=port), concurrency=2
+    )
+
+    assert await dispatcher.dispatch_once() == 5
+    assert await dispatcher.dispatch_once() == 0
+    dispatcher.pool.close()
+
+    assert sorted(rcpt for _, rcpt, _ in sink.messages) == [
+        f"user{n}@example.com" for n in range(5)
+    ]
+    rows = await outbox_rows(session_factory)
+    assert all(row.status == OUTBOX_SENT and row.sent_at for row in rows)
+    # Bodies are not kept once delivered
+    assert all(row.html_content == "" for row in rows)
+    assert all(row.attempts == 1 for row in rows)
+    assert sample("email_outbox_attempts_total", outcome="sent") - sent_before == 5
+    # The batch was split over two sessions
+    assert sample("email_send_duration_seconds_count") - batches_before == 2
+    assert sample("email_outbox_depth", status=OUTBOX_PENDING) == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_emails_back_off_then_dead_letter(session_factory):
+    await add_emails(session_factory, 1)
+    dispatcher = OutboxDispatcher(
+        session_factory,
+        SMTPPool(1, host="127.0.0.1", port=free_port(), timeout=1),
+        max_attempts=2,
+        backoff=60.0,
+    )
+
+    assert await dispatcher.dispatch_once() == 1
+    [row] = await outbox_rows(session_factory)
+    assert row.status == OUTBOX_PENDING
+    assert row.attempts == 1
+    assert row.last_error
+    assert row.html_content == "<p>0</p>"
+    # Retried no sooner than half the backoff
+    retry_at = row.next_attempt_at.replace(tzinfo=timezone.utc)
+    assert retry_at >= datetime.now(timezone.utc) + timedelta(seconds=25)
+    assert sample("email_outbox_depth", status=OUTBOX_PENDING) == 1
+    # Not due yet
+    assert await dispatcher.dispatch_once() == 0
+
+    async with session_factory() as session:
+        await session.exec(  # type: ignore[call-overload]
+            update(EmailOutbox).values(
+                next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+            )
+        )
+        await session.commit()
+    assert await dispatcher.dispatch_once() == 1
+    [row] = await outbox_rows(session_factory)
+    assert row.status == OUTBOX_DEAD
+    assert row.attempts == 2
+    assert row.html_content == ""
+    assert sample("email_outbox_depth", status=OUTBOX_DEAD) == 1
+    # Dead letters are not claimed again
+    assert await dispatcher.dispatch_once() == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_claim_leases_rows(session_factory):
+    await add_emails(session_factory, 3)
+    async with session_factory() as session:
+        first = await crud.claim_outbox_emails_async(session, 2, timedelta(minutes=5))
+        second = await crud.claim_outbox_emails_async(session, 2, timedelta(minutes=5))
+        third = await crud.claim_outbox_emails_async(session, 2, timedelta(minutes=5))
+    assert len(first) == 2
+    assert len(second) == 1
+    assert not third
+    assert {email.id for email in first}.isdisjoint(email.id for email in second)
+
+
+@pytest.mark.unit
+def test_retry_delay_grows_exponentially_up_to_the_cap():
+    dispatcher = OutboxDispatcher(
+        async_sessionmaker(), SMTPPool(1), backoff=10.0, backoff_max=100.0
+    )
+    assert 5.0 <= dispatcher.retry_delay(1) <= 10.0
+    assert 20.0 <= dispatcher.retry_delay(3) <= 40.0
+    assert 50.0 <= dispatcher.retry_delay(10) <= 100.0
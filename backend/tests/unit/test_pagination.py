@@ -0,0 +1,22 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.pagination import Cursor, decode_cursor, encode_cursor
+
+
+@pytest.mark.unit
+def test_cursor_round_trip():
+    sort_key = datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    id = uuid.uuid4()
+    token = encode_cursor(sort_key, id)
+    assert "=" not in token
+    assert decode_cursor(token) == Cursor(sort_key, id)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "bm90IGpzb24"])
+def test_decode_cursor_rejects_garbage(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
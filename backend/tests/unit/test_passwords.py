@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import hashing
+from app.core.passwords import PasswordService, PasswordServiceBusy, password_service
+from app.core.security import verify_password
+from app.main import app
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_password_service_hashes_in_worker_processes():
+    service = PasswordService(workers=1)
+    try:
+        hashed = await service.hash("secret")
+        assert verify_password("secret", hashed)
+        assert await service.verify("secret", hashed)
+        assert not await service.verify("wrong", hashed)
+        assert service.stats()["in_flight"] == 0
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_password_service_fails_fast_when_queue_is_full():
+    service = PasswordService(workers=1, max_pending=1)
+    service.start()
+    try:
+        results = await asyncio.gather(
+            *(service.hash("secret") for _ in range(3)), return_exceptions=True
+        )
+        assert [isinstance(r, PasswordServiceBusy) for r in results] == [
+            False,
+            False,
+            True,
+        ]
+        assert service.stats()["rejected"] == 1
+        # Capacity is released as jobs finish
+        assert await service.hash("secret")
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_password_service_starts_off_the_event_loop(monkeypatch):
+    ticks = 0
+    ticks_while_calibrating = 0
+
+    def slow_calibrate(_target_ms: float) -> int:
+        nonlocal ticks_while_calibrating
+        before = ticks
+        time.sleep(0.2)
+        ticks_while_calibrating = ticks - before
+        return hashing.MIN_ROUNDS
+
+    async def tick() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(hashing, "calibrate_rounds", slow_calibrate)
+    service = PasswordService(workers=1)
+    ticker = asyncio.create_task(tick())
+    try:
+        assert await service.hash("secret")
+    finally:
+        ticker.cancel()
+        service.shutdown()
+    assert ticks_while_calibrating > 5
+
+
+@pytest.mark.unit
+def test_app_shuts_the_password_pool_down():
+    with TestClient(app):
+        assert password_service._executor is not None
+    assert password_service._executor is None
@@ -0,0 +1,30 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.api import responses
+from app.models import Item, ItemPublic
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("with_orjson", [True, False])
+def test_fast_json_response_renders_public_rows(monkeypatch, with_orjson):
+    if not with_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    item = Item(
+        id=uuid.uuid4(),
+        title="Ünïcode",
+        description=None,
+        owner_id=uuid.uuid4(),
+        created_at=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    )
+    rows = responses.public_rows([item], ItemPublic)
+    assert rows == [responses.public_row(item, ItemPublic)]
+
+    body = responses.FastJSONResponse({"data": rows, "at": item.created_at}).body
+    assert json.loads(body) == {
+        "data": [json.loads(ItemPublic.model_validate(item).model_dump_json())],
+        "at": "2024-01-02T03:04:05+00:00",
+    }
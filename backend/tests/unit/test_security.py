@@ -0,0 +1,33 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from app.core import security
+
+
+@pytest.mark.unit
+def test_decode_access_token_verifies_once_per_token():
+    token = security.create_access_token("a@example.com", timedelta(minutes=5))
+    with patch.object(security.jwt, "decode", wraps=jwt.decode) as decode:
+        for _ in range(3):
+            assert security.decode_access_token(token)["sub"] == "a@example.com"
+    assert decode.call_count == 1
+
+
+@pytest.mark.unit
+def test_decode_access_token_rejects_bad_signature():
+    token = jwt.encode({"sub": "a@example.com"}, "not-the-secret", algorithm="HS256")
+    with pytest.raises(jwt.InvalidTokenError):
+        security.decode_access_token(token)
+
+
+@pytest.mark.unit
+def test_cached_token_does_not_outlive_its_expiry():
+    token = security.create_access_token("a@example.com", timedelta(seconds=1))
+    security.decode_access_token(token)
+    time.sleep(1.1)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        security.decode_access_token(token)
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from app.core.throttle import LoginThrottle, MemoryThrottleStore
+
+
+def make_throttle(maxsize: int = 100, window: float = 60.0) -> LoginThrottle:
+    return LoginThrottle(
+        MemoryThrottleStore(maxsize=maxsize),
+        window=window,
+        max_per_email=2,
+        max_per_ip=3,
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_throttle_by_email_and_ip():
+    throttle = make_throttle()
+    for _ in range(2):
+        _, retry_after = await throttle.attempt("a@example.com", "10.0.0.1")
+        assert retry_after is None
+
+    _, retry_after = await throttle.attempt("A@example.com", "10.0.0.2")
+    assert retry_after is not None
+    assert 59 < retry_after <= 60
+    # Same IP, other email: the rejected attempt above was not counted, so
+    # one more is allowed on the IP key
+    _, retry_after = await throttle.attempt("b@example.com", "10.0.0.1")
+    assert retry_after is None
+    _, retry_after = await throttle.attempt("c@example.com", "10.0.0.1")
+    assert retry_after is not None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_throttle_counts_concurrent_attempts():
+    throttle = make_throttle()
+    results = await asyncio.gather(
+        *(throttle.attempt("a@example.com", "10.0.0.1") for _ in range(5))
+    )
+    assert [retry_after is None for _, retry_after in results].count(True) == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_throttle_window_slides_and_success_resets_email():
+    throttle = make_throttle(window=0.0)
+    for _ in range(3):
+        await throttle.attempt("a@example.com", "10.0.0.1")
+    _, retry_after = await throttle.attempt("a@example.com", "10.0.0.1")
+    assert retry_after is None
+
+    throttle = make_throttle()
+    await throttle.attempt("a@example.com", "10.0.0.1")
+    attempted_at, _ = await throttle.attempt("a@example.com", "10.0.0.1")
+    await throttle.record_success("a@example.com", "10.0.0.1", attempted_at)
+    _, retry_after = await throttle.attempt("a@example.com", "10.0.0.2")
+    assert retry_after is None
+    # The successful attempt no longer counts against the IP
+    assert len(await throttle.store.hits("login:ip:10.0.0.1", 0.0)) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_memory_store_is_bounded():
+    store = MemoryThrottleStore(maxsize=2)
+    for key in ("a", "b", "c"):
+        await store.add(key, 1.0, 60.0)
+    assert await store.hits("a", 0.0) == []
+    assert await store.hits("c", 0.0) == [1.0]
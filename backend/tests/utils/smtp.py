@@ -0,0 +1,22 @@
+import socket
+
+
+class Sink:
+    """aiosmtpd handler recording each message and the session it came on."""
+
+    def __init__(self) -> None:
+        self.messages: list[tuple[int, str, bytes]] = []
+
+    async def handle_DATA(self, _server, session, envelope) -> str:
+        self.messages.append((id(session), envelope.rcpt_tos[0], envelope.content))
+        return "250 OK"
+
+    @property
+    def sessions(self) -> set[int]:
+        return {session for session, _, _ in self.messages}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
@@ -1,9 +1,14 @@
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
 
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, SQLModel, create_engine
 
 # Create an in-memory SQLite database for tests
 TEST_SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+TEST_ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
 # Create test engine with SQLite
 test_engine = create_engine(
@@ -12,6 +17,13 @@ test_engine = create_engine(
     echo=False,
 )
 
+# Async engine over the same file, used by the API under test. Connections are
+# not pooled: each test runs its own event loop and aiosqlite worker threads
+# must not outlive it.
+test_async_engine = create_async_engine(
+    TEST_ASYNC_SQLALCHEMY_DATABASE_URL, echo=False, poolclass=NullPool
+)
+
 
 # Create tables only once
 def create_test_tables():
@@ -32,3 +44,19 @@ def get_test_db() -> Generator[Session, None, None]:
 def init_test_db() -> None:
     """Initialize the test database."""
     SQLModel.metadata.create_all(test_engine)
+
+
+@contextmanager
+def capture_selects(engine) -> Iterator[list[tuple[str, tuple]]]:
+    """Record the SELECT statements ``engine`` runs, with their parameters."""
+    statements: list[tuple[str, tuple]] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, parameters, *_args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
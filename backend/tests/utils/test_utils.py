@@ -1,16 +1,9 @@
-from unittest.mock import patch
-
 import pytest
-from emails.template import JinjaTemplate
 from fastapi import HTTPException
 
+from app.api.routes.login import new_account_email, reset_password_email
 from app.core.config import settings
-from app.utils import (
-    generate_new_account_email,
-    generate_password_reset_token,
-    send_reset_password_email,
-    verify_password_reset_token,
-)
+from app.utils import generate_password_reset_token, verify_password_reset_token
 
 
 # Mock settings for tests
@@ -28,8 +21,7 @@ def setup_settings():
     mock_settings()
 
 
-@patch("app.utils.send_email")
-def test_generate_password_reset_token(_mock_send_email):
+def test_generate_password_reset_token():
     """Test generating a password reset token."""
     email = "test@example.com"
     token = generate_password_reset_token(email)
@@ -37,8 +29,7 @@ def test_generate_password_reset_token(_mock_send_email):
     assert len(token) > 0
 
 
-@patch("app.utils.send_email")
-def test_verify_password_reset_token(_mock_send_email):
+def test_verify_password_reset_token():
     """Test verifying a password reset token."""
     email = "test@example.com"
     token = generate_password_reset_token(email)
@@ -61,58 +52,32 @@ def test_verify_password_reset_token(_mock_send_email):
         verify_password_reset_token(tampered_token)
 
 
-@patch("app.utils.send_email")
-def test_generate_new_account_email(mock_send_email):
+def test_new_account_email():
     email = "test@example.com"
-    generate_new_account_email(email)
-
-    mock_send_email.assert_called_once()
-    call_args = mock_send_email.call_args[1]
-
-    assert call_args["email_to"] == email
-    assert "Welcome to Test Project" in call_args["subject"]
-
-    # Test that environment variables are passed correctly
-    env = call_args["environment"]
-    assert env["project_name"] == settings.PROJECT_NAME
-    assert env["email"] == email
+    message = new_account_email(email_to=email, username=email)
 
-    # Create a JinjaTemplate and render it to verify template variables
-    template = JinjaTemplate(call_args["html_content"])
-    rendered = template.render(**env)
+    assert message.email_to == email
+    assert "Test Project - New account" in message.subject
 
-    assert "{{ project_name }}" not in rendered
-    assert "{{ email }}" not in rendered
+    # The body is rendered from the compiled template
+    rendered = message.html_content
+    assert "{{" not in rendered
     assert settings.PROJECT_NAME in rendered
     assert email in rendered
 
 
-@patch("app.utils.send_email")
-def test_send_reset_password_email(mock_send_email):
+def test_reset_password_email():
     email = "test@example.com"
     token = generate_password_reset_token(email)
-    send_reset_password_email(email, email, token)
-
-    mock_send_email.assert_called_once()
-    call_args = mock_send_email.call_args[1]
-
-    assert call_args["email_to"] == email
-    assert "Password recovery" in call_args["subject"]
-
-    # Test that environment variables are passed correctly
-    env = call_args["environment"]
-    assert env["project_name"] == settings.PROJECT_NAME
-    assert env["username"] == email
-    assert env["valid_hours"] == settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS
-    assert env["link"] == f"{settings.SERVER_HOST}/reset-password?token={token}"
+    message = reset_password_email(email_to=email, token=token)
 
-    # Create a JinjaTemplate and render it to verify template variables
-    template = JinjaTemplate(call_args["html_content"])
-    rendered = template.render(**env)
+    assert message.email_to == email
+    assert "Password reset" in message.subject
 
-    assert "{{ project_name }}" not in rendered
-    assert "{{ username }}" not in rendered
-    assert "{{ link }}" not in rendered
+    # The body is rendered from the compiled template
+    rendered = message.html_content
+    assert "{{" not in rendered
     assert settings.PROJECT_NAME in rendered
     assert email in rendered
-    assert token in rendered
+    assert f"{settings.SERVER_HOST}/new-password?token={token}" in rendered
+    assert f"{settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS} hours" in rendered